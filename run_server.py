@@ -6,19 +6,22 @@ Simple script to run the LangChain Agent MCP Server
 import os
 import sys
 from pathlib import Path
-from dotenv import load_dotenv
-import uvicorn
+
+from src._dotenv_fast import load_cached as load_env_file
+
 
 if __name__ == "__main__":
     # Load .env file from project root
     project_root = Path(__file__).parent
     env_file = project_root / ".env"
     if env_file.exists():
-        load_dotenv(env_file)
+        load_env_file(env_file)
         print(f"Loaded environment variables from {env_file}")
     else:
         # Also try loading from current directory
-        load_dotenv()
+        cwd_env_file = Path.cwd() / ".env"
+        if cwd_env_file.exists():
+            load_env_file(cwd_env_file)
     
     # Check for required environment variables
     if not os.getenv("OPENAI_API_KEY"):
@@ -31,6 +34,9 @@ if __name__ == "__main__":
     port = int(os.getenv("PORT", "8000"))
     host = os.getenv("HOST", "0.0.0.0")
     
+    # Imported only once we know the server will actually start
+    import uvicorn
+
     print(f"Starting LangChain Agent MCP Server on {host}:{port}")
     print(f"API Documentation: http://{host}:{port}/docs")
     print(f"Health Check: http://{host}:{port}/health")
@@ -0,0 +1,150 @@
+"""
+Minimal .env Parser
+
+A small replacement for python-dotenv used on the server startup path, plus
+a JSON cache of the parsed file (load_cached) shared by run_server.py and
+src/main.py.
+
+Supported syntax: ``KEY=VALUE`` lines, an optional ``export`` prefix, ``#``
+comment lines, trailing comments (whitespace then ``#``), and values wrapped in single or
+double quotes, with python-dotenv's escape sequences (``\\n``, ``\\"`` ...
+in double quotes, ``\\'`` and ``\\\\`` in single quotes). Anything fancier
+(multi-line values, variable expansion) needs python-dotenv.
+"""
+
+import codecs
+import json
+import logging
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Bump when the .env.cache layout changes
+CACHE_VERSION = 4
+
+# A quoted value at the start of the string; anything after the closing
+# quote (e.g. a comment) is ignored
+_DOUBLE_QUOTED = re.compile(r'"((?:[^"\\]|\\.)*)"')
+_SINGLE_QUOTED = re.compile(r"'((?:[^'\\]|\\.)*)'")
+_DOUBLE_QUOTE_ESCAPES = re.compile(r"\\[\\'\"abfnrtv]")
+_SINGLE_QUOTE_ESCAPES = re.compile(r"\\[\\']")
+# Whitespace (space or tab) followed by # starts a trailing comment
+_TRAILING_COMMENT = re.compile(r"\s+#")
+
+
+def _unescape(value: str, escapes: "re.Pattern[str]") -> str:
+    return escapes.sub(lambda m: codecs.decode(m.group(0), "unicode-escape"), value)
+
+
+def _parse_value(value: str) -> str:
+    stripped = value.lstrip()
+    if stripped[:1] == '"':
+        m = _DOUBLE_QUOTED.match(stripped)
+        if m:
+            return _unescape(m.group(1), _DOUBLE_QUOTE_ESCAPES)
+    elif stripped[:1] == "'":
+        m = _SINGLE_QUOTED.match(stripped)
+        if m:
+            return _unescape(m.group(1), _SINGLE_QUOTE_ESCAPES)
+    # Split before stripping so "KEY= # note" is empty but "KEY=#x" is kept
+    return _TRAILING_COMMENT.split(value, 1)[0].strip()
+
+
+def parse(path: Union[str, Path]) -> Dict[str, str]:
+    """
+    Parse a .env file.
+
+    Args:
+        path: Path to the .env file
+
+    Returns:
+        Mapping of variable names to values
+    """
+    values: Dict[str, str] = {}
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("export "):
+            line = line[len("export "):]
+        key, sep, value = line.partition("=")
+        key = key.strip()
+        if not sep or not key:
+            continue
+        values[key] = _parse_value(value)
+    return values
+
+
+def load(path: Union[str, Path]) -> None:
+    """
+    Load a .env file into os.environ without overriding existing variables.
+
+    Args:
+        path: Path to the .env file
+    """
+    for key, value in parse(path).items():
+        os.environ.setdefault(key, value)
+
+
+def load_cached(path: Union[str, Path]) -> None:
+    """
+    Load a .env file into os.environ, reusing a cached parse when possible.
+
+    The parsed values are cached next to the file as ``.env.cache`` and keyed
+    on the file's mtime and size, so warm starts skip parsing entirely. The
+    cache holds the same secrets as .env, so it is created owner-only (0600).
+    Cold starts use parse(); set DOTENV_COMPAT=true to parse with python-dotenv
+    instead. Like load_dotenv, existing environment variables are never
+    overridden.
+
+    Args:
+        path: Path to the .env file
+    """
+    env_file = Path(path)
+    compat = os.getenv("DOTENV_COMPAT", "false").lower() == "true"
+    cache_file = env_file.with_name(env_file.name + ".cache")
+    st = env_file.stat()
+    header = [st.st_mtime_ns, st.st_size, CACHE_VERSION, compat]
+
+    values: Optional[Dict[str, str]] = None
+    try:
+        # JSON rather than pickle: loading the cache must never run code
+        with open(cache_file, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached["header"] == header and isinstance(cached["values"], dict):
+            values = cached["values"]
+    except Exception:
+        # Missing or unreadable cache - fall back to parsing
+        pass
+
+    if values is None:
+        if compat:
+            # Full python-dotenv syntax; imported lazily as it is rarely needed
+            from dotenv import dotenv_values
+
+            values = {k: v for k, v in dotenv_values(env_file).items() if v is not None}
+        else:
+            values = parse(env_file)
+        tmp_name = None
+        try:
+            # mkstemp gives each concurrent worker its own 0600 file
+            fd, tmp_name = tempfile.mkstemp(
+                dir=cache_file.parent, prefix=cache_file.name + ".", suffix=".tmp"
+            )
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"header": header, "values": values}, f)
+            os.replace(tmp_name, cache_file)
+        except OSError as e:
+            logger.warning(f"Could not write {cache_file}: {e}")
+            if tmp_name is not None:
+                try:
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
+
+    for key, value in values.items():
+        os.environ.setdefault(key, value)
@@ -5,7 +5,9 @@ This module defines the LangChain agent with its tools and execution logic.
 """
 
 import os
-from typing import List, Optional
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
 from langchain_openai import ChatOpenAI
 from langchain_core.tools import Tool
 from langchain.agents import AgentExecutor, create_react_agent
@@ -74,17 +76,16 @@ def create_agent_tools() -> List[Tool]:
     return tools
 
 
-def initialize_agent() -> AgentExecutor:
+def _build_components() -> Tuple[ChatOpenAI, List[Tool], PromptTemplate]:
     """
-    Initialize the LangChain agent with tools.
+    Build the LLM client, tools and base ReAct prompt.
     
-    The agent is initialized once at server startup and reused for all requests.
+    These are shared by every executor; the prompt may be pulled from
+    LangChain Hub over the network, so this runs once per process.
     
     Returns:
-        AgentExecutor instance
+        Tuple of (llm, tools, prompt)
     """
-    logger.info("Initializing LangChain agent...")
-    
     # Get OpenAI API key from environment
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
@@ -129,35 +130,128 @@ Question: {input}
 Thought: {agent_scratchpad}"""
         )
     
+    return llm, tools, prompt
+
+
+# Shared LLM, tools and base prompt (built on first use)
+_components: Optional[Tuple[ChatOpenAI, List[Tool], PromptTemplate]] = None
+_components_lock = threading.Lock()
+
+
+def _get_components() -> Tuple[ChatOpenAI, List[Tool], PromptTemplate]:
+    global _components
+    with _components_lock:
+        if _components is None:
+            _components = _build_components()
+        return _components
+
+
+def _create_executor(llm: ChatOpenAI, tools: List[Tool], prompt: PromptTemplate) -> AgentExecutor:
     # Create the agent
     agent = create_react_agent(llm, tools, prompt)
     
     # Create the agent executor
-    agent_executor = AgentExecutor(
+    return AgentExecutor(
         agent=agent,
         tools=tools,
         verbose=os.getenv("VERBOSE", "false").lower() == "true",
         handle_parsing_errors=True,
         max_iterations=int(os.getenv("MAX_ITERATIONS", "10")),
     )
+
+
+def initialize_agent() -> AgentExecutor:
+    """
+    Initialize the LangChain agent with tools.
     
+    The agent is initialized once at server startup and reused for all requests.
+    
+    Returns:
+        AgentExecutor instance
+    """
+    logger.info("Initializing LangChain agent...")
+    agent_executor = _create_executor(*_get_components())
     logger.info("Agent initialized successfully")
     return agent_executor
 
 
+def _instruction_prompt(prompt: PromptTemplate, system_instruction: str) -> PromptTemplate:
+    """Prepend a custom instruction to the base prompt"""
+    # Escape braces so the instruction is not parsed as template variables
+    escaped = system_instruction.replace("{", "{{").replace("}", "}}")
+    return PromptTemplate.from_template(f"{escaped}\n\n{prompt.template}")
+
+
+def _agent_for_instruction(system_instruction: str) -> AgentExecutor:
+    """
+    Build an executor whose prompt starts with a custom instruction.
+    
+    Reuses the shared LLM, tools and base prompt, so only the prompt template
+    and executor wrapper are new.
+    """
+    llm, tools, prompt = _get_components()
+    return _create_executor(llm, tools, _instruction_prompt(prompt, system_instruction))
+
+
 # Global agent instance (initialized at startup)
 _agent_executor: Optional[AgentExecutor] = None
 
+# Executors for recent custom instructions, least recently used first
+_INSTRUCTION_CACHE_SIZE = 32
+_instruction_agents: "OrderedDict[str, AgentExecutor]" = OrderedDict()
+
+# Guards building and caching executors (get_agent runs in worker threads)
+_agents_lock = threading.Lock()
+
+
+def get_cached_agent(system_instruction: Optional[str] = None) -> Optional[AgentExecutor]:
+    """
+    Return an already-built executor without building one.
+    
+    Args:
+        system_instruction: Optional custom instruction prepended to the prompt
+        
+    Returns:
+        AgentExecutor instance, or None if get_agent() still has to build it
+    """
+    if not system_instruction:
+        return _agent_executor
+    key = str(system_instruction)
+    with _agents_lock:
+        executor = _instruction_agents.get(key)
+        if executor is not None:
+            _instruction_agents.move_to_end(key)
+        return executor
 
-def get_agent() -> AgentExecutor:
+
+def get_agent(system_instruction: Optional[str] = None) -> AgentExecutor:
     """
     Get the global agent executor instance.
     
+    The first call may pull the prompt from LangChain Hub, so async callers
+    should try get_cached_agent() first and run this in a worker thread.
+    
+    Args:
+        system_instruction: Optional custom instruction prepended to the
+            prompt; executors for recent instructions are cached
+        
     Returns:
         AgentExecutor instance
     """
     global _agent_executor
-    if _agent_executor is None:
-        _agent_executor = initialize_agent()
-    return _agent_executor
-
+    executor = get_cached_agent(system_instruction)
+    if executor is not None:
+        return executor
+    with _agents_lock:
+        if not system_instruction:
+            if _agent_executor is None:
+                _agent_executor = initialize_agent()
+            return _agent_executor
+        key = str(system_instruction)
+        executor = _instruction_agents.get(key)
+        if executor is None:
+            executor = _agent_for_instruction(key)
+            _instruction_agents[key] = executor
+            if len(_instruction_agents) > _INSTRUCTION_CACHE_SIZE:
+                _instruction_agents.popitem(last=False)
+        return executor
@@ -0,0 +1,150 @@
+"""
+Runtime Configuration
+
+This module reads server configuration from environment variables.
+
+Environment variables are read from a single snapshot of the keys listed in
+``_KEYS``, taken from ``os.environ`` at import time; the environment is treated
+as immutable for the lifetime of the process. Call ``refresh_env_cache()`` after mutating ``os.environ`` (tests,
+or after ``load_dotenv``) to pick up the new values.
+"""
+
+import functools
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Optional, Tuple
+
+# Environment variables read by load_config
+_KEYS = frozenset({
+    "API_KEY",
+    "REDIS_URL",
+    "POLICY_ENFORCEMENT",
+    "MAX_QUERY_CHARS",
+    "ALLOWLISTED_DOMAINS",
+    "TASK_TTL_SECONDS",
+    "RECENT_TASKS_MAX",
+    "LANGCHAIN_MAX_ITERATIONS",
+    "MAX_ITERATIONS",
+    "OPENAI_MODEL",
+    "VERBOSE",
+    "CORS_ORIGINS",
+    "PLAYWRIGHT_MAX_CONCURRENCY",
+})
+
+
+def _snapshot_env() -> Dict[str, str]:
+    """Collect the variables of interest in a single pass over os.environ."""
+    return {k: v for k, v in os.environ.items() if k in _KEYS}
+
+
+# Snapshot of the process environment (see refresh_env_cache)
+_ENV: Dict[str, str] = _snapshot_env()
+
+# Accepted truthy values; common casings are listed so they skip .lower()
+_TRUTHY = frozenset({
+    "1", "true", "yes", "y", "on",
+    "True", "Yes", "Y", "On",
+    "TRUE", "YES", "ON",
+})
+
+# Comma separator including any surrounding whitespace
+_CSV_SPLIT = re.compile(r"\s*,\s*")
+
+
+def _get_env(name: str, default: Optional[str] = None) -> Optional[str]:
+    """Return a stripped environment value, treating empty strings as unset."""
+    return (_ENV.get(name, default) or "").strip() or None
+
+
+@functools.lru_cache(maxsize=None)
+def _get_bool(name: str, default: bool = False) -> bool:
+    v = _get_env(name)
+    if v is None:
+        return default
+    return v in _TRUTHY or v.lower() in _TRUTHY
+
+
+@functools.lru_cache(maxsize=None)
+def _get_int(name: str, default: int) -> int:
+    v = _get_env(name)
+    if v is None:
+        return default
+    try:
+        return int(v)
+    except ValueError:
+        return default
+
+
+@functools.lru_cache(maxsize=None)
+def _get_csv(name: str, default: str = "") -> Tuple[str, ...]:
+    # A tuple, because the cached result is shared by every caller
+    v = _get_env(name, default)
+    if v is None:
+        return ()
+    return tuple(p for p in _CSV_SPLIT.split(v) if p)
+
+
+def refresh_env_cache() -> None:
+    """
+    Re-snapshot ``os.environ`` and drop all memoized lookups.
+
+    Intended for tests and for callers that load a ``.env`` file after this
+    module has been imported.
+    """
+    global _ENV
+    _ENV = _snapshot_env()
+    _get_bool.cache_clear()
+    _get_int.cache_clear()
+    _get_csv.cache_clear()
+    load_config.cache_clear()
+
+
+@dataclass(frozen=True)
+class RuntimeConfig:
+    """Server runtime configuration"""
+    api_key: Optional[str]
+    redis_url: Optional[str]
+    policy_enforcement: bool
+    max_query_chars: int
+    allowlisted_domains: FrozenSet[str]
+    task_ttl_seconds: int
+    recent_tasks_max: int
+    max_iterations: int
+    openai_model: str
+    verbose: bool
+    cors_origins: Tuple[str, ...]
+    playwright_max_concurrency: int
+
+
+@functools.lru_cache(maxsize=1)
+def load_config() -> RuntimeConfig:
+    """
+    Build the runtime configuration from the environment.
+
+    The configuration is built once and shared; RuntimeConfig is frozen so
+    the cached instance is safe to hand out. To change configuration, the
+    operator flips the environment and restarts the process. Tests can call
+    ``load_config.cache_clear()`` (or ``refresh_env_cache()``) to rebuild it.
+
+    Returns:
+        RuntimeConfig instance
+    """
+    return RuntimeConfig(
+        api_key=_get_env("API_KEY"),
+        redis_url=_get_env("REDIS_URL"),
+        policy_enforcement=_get_bool("POLICY_ENFORCEMENT", True),
+        max_query_chars=_get_int("MAX_QUERY_CHARS", 8000),
+        allowlisted_domains=frozenset(
+            d.lower() for d in _get_csv("ALLOWLISTED_DOMAINS")
+        ),
+        task_ttl_seconds=_get_int("TASK_TTL_SECONDS", 86400),
+        recent_tasks_max=_get_int("RECENT_TASKS_MAX", 200),
+        max_iterations=_get_int(
+            "LANGCHAIN_MAX_ITERATIONS", _get_int("MAX_ITERATIONS", 10)
+        ),
+        openai_model=_get_env("OPENAI_MODEL") or "gpt-4o-mini",
+        verbose=_get_bool("VERBOSE", False),
+        cors_origins=_get_csv("CORS_ORIGINS", "*"),
+        playwright_max_concurrency=max(1, _get_int("PLAYWRIGHT_MAX_CONCURRENCY", 4)),
+    )
@@ -5,22 +5,26 @@ This module implements the FastAPI application with MCP endpoints.
 """
 
 import hashlib
+import hmac
 import json
 import logging
 import os
+import re
 import sys
 import time
 import uuid
+from collections import OrderedDict
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Dict, Any, Optional
-from fastapi import FastAPI, HTTPException, Header, Request
-from fastapi.responses import JSONResponse
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from fastapi import FastAPI, HTTPException, Header
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel, Field
-from dotenv import load_dotenv
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 import anyio
 import asyncio
+import orjson
 
 # Set event loop policy for Windows compatibility with Playwright
 # MUST use ProactorEventLoop on Windows because Playwright requires subprocess support
@@ -35,8 +39,21 @@ try:
 except ImportError:
     PLAYWRIGHT_AVAILABLE = False
 
-from src.agent import get_agent
-from src.config import load_config, RuntimeConfig
+# Transient errors worth retrying; anything else (bad input, auth) fails fast
+_RETRYABLE_EXCEPTIONS: tuple = (TimeoutError, ConnectionError)
+try:
+    import openai
+    _RETRYABLE_EXCEPTIONS += (
+        openai.RateLimitError,
+        openai.APIConnectionError,
+        openai.InternalServerError,
+    )
+except ImportError:
+    pass
+
+from src._dotenv_fast import load_cached
+from src.agent import get_agent, get_cached_agent
+from src.config import load_config, refresh_env_cache, RuntimeConfig
 from src.policy import evaluate_invoke_policy
 from src.state_store import (
     InMemoryStateStore,
@@ -46,14 +63,17 @@ from src.state_store import (
     now_ts,
 )
 
-# Load environment variables from project root
+# Load environment variables from project root. When started through
+# run_server.py this is a cache hit and every key is already set.
 project_root = Path(__file__).parent.parent
 env_file = project_root / ".env"
-if env_file.exists():
-    load_dotenv(env_file)
-else:
+if not env_file.exists():
     # Fallback to current directory
-    load_dotenv()
+    env_file = Path.cwd() / ".env"
+if env_file.exists():
+    load_cached(env_file)
+# src.config snapshots os.environ at import, before .env was loaded
+refresh_env_cache()
 
 # Configure logging
 logging.basicConfig(
@@ -66,26 +86,82 @@ logger = logging.getLogger(__name__)
 if not PLAYWRIGHT_AVAILABLE:
     logger.warning("Playwright not available. Playwright sandbox features will be disabled.")
 
+
+class ORJSONResponse(JSONResponse):
+    """JSON response serialized with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="LangChain Agent MCP Server",
     description="MCP-compliant server exposing LangChain agent capabilities",
-    version="1.1.0"
+    version="1.1.0",
+    default_response_class=ORJSONResponse,
 )
 
 # Global runtime config/state
 _config: RuntimeConfig = load_config()
 _state_store: StateStore = InMemoryStateStore()
 
+
+def _expected_auth(config: RuntimeConfig) -> Optional[bytes]:
+    """Precomputed Authorization header value, or None when auth is disabled"""
+    return f"Bearer {config.api_key}".encode() if config.api_key else None
+
+
+_EXPECTED_AUTH: Optional[bytes] = _expected_auth(_config)
+
+
+def _is_authorized(authorization: Optional[str]) -> bool:
+    """Constant-time check of the Authorization header against the API key"""
+    if _EXPECTED_AUTH is None:
+        return True
+    if authorization is None:
+        return False
+    return hmac.compare_digest(authorization.encode(), _EXPECTED_AUTH)
+
+
+def _load_manifest():
+    """
+    Read mcp_manifest.json, returning (bytes, error).
+
+    The file is parsed only to validate it; the raw bytes are what gets served.
+    """
+    manifest_path = os.path.join(os.path.dirname(__file__), "mcp_manifest.json")
+    try:
+        with open(manifest_path, "rb") as f:
+            raw = f.read()
+        json.loads(raw)
+        return raw, None
+    except FileNotFoundError:
+        logger.error("Manifest file not found")
+        return None, "Manifest file not found"
+    except json.JSONDecodeError as e:
+        logger.error(f"Invalid JSON in manifest: {e}")
+        return None, "Invalid manifest format"
+    except Exception as e:
+        logger.error(f"Error loading manifest: {e}")
+        return None, str(e)
+
+
+# MCP manifest, loaded once and served from memory
+_MANIFEST_BYTES, _MANIFEST_ERROR = _load_manifest()
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=os.getenv("CORS_ORIGINS", "*").split(","),
+    allow_origins=list(_config.cors_origins),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Compress large responses (agent output, accessibility snapshots, task lists)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 
 # Request/Response Models
 class MCPInvokeRequest(BaseModel):
@@ -120,6 +196,12 @@ class PlaywrightSnapshotResponse(BaseModel):
     token_count: Optional[int] = Field(None, description="Estimated token count of the snapshot")
 
 
+# Agent invocation attempts per request (first try + retries)
+_AGENT_MAX_ATTEMPTS = 3
+# Pause between attempts; tenacity's wait_exponential(min=2) gave 2s then 2s
+_AGENT_RETRY_DELAY_SECONDS = 2
+
+
 def _mcp_error(text: str, code: Optional[str] = None) -> Dict[str, Any]:
     payload: Dict[str, Any] = {
         "content": [{"type": "text", "text": text}],
@@ -130,60 +212,101 @@ def _mcp_error(text: str, code: Optional[str] = None) -> Dict[str, Any]:
     return payload
 
 
-def _preview(text: str, limit: int = 500) -> str:
+def _preview(text: Any, limit: int = 500) -> str:
     if text is None:
         return ""
-    t = str(text)
+    # Short strings are returned as-is, without a str() copy
+    t = text if isinstance(text, str) else str(text)
     return t if len(t) <= limit else (t[:limit] + "…")
 
 
 def _sha256(text: str) -> str:
-    return hashlib.sha256((text or "").encode("utf-8", errors="ignore")).hexdigest()
+    # Identity hash for monitoring only, not a security control
+    return hashlib.sha256(
+        (text or "").encode("utf-8", errors="ignore"), usedforsecurity=False
+    ).hexdigest()
 
 
-@app.middleware("http")
-async def glazyr_policy_middleware(request: Request, call_next):
+class PolicyASGIMiddleware:
     """
     Policy gate for /mcp/invoke.
 
-    NOTE: We must buffer+replay the request body so FastAPI can still parse it.
+    Implemented as pure ASGI middleware: every other request is passed through
+    untouched, without reading the body. For /mcp/invoke the body is buffered,
+    checked, then replayed so FastAPI can still parse it.
     """
-    if request.url.path != "/mcp/invoke" or request.method.upper() != "POST":
-        return await call_next(request)
 
-    if not _config.policy_enforcement:
-        return await call_next(request)
+    def __init__(self, app, get_config: Callable[[], RuntimeConfig]):
+        self.app = app
+        # Resolved per request since startup may reload the config
+        self.get_config = get_config
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["path"] != "/mcp/invoke"
+            or scope["method"] != "POST"
+        ):
+            return await self.app(scope, receive, send)
+
+        config = self.get_config()
+        if not config.policy_enforcement:
+            return await self.app(scope, receive, send)
+
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        body_bytes = b"".join(chunks)
 
-    body_bytes = await request.body()
+        try:
+            payload = orjson.loads(body_bytes)
+        except orjson.JSONDecodeError:
+            response = ORJSONResponse(
+                status_code=400,
+                content=_mcp_error("Invalid JSON body", code="INVALID_JSON"),
+            )
+            return await response(scope, receive, send)
+
+        # Only agent_executor calls with a query are subject to policy; anything
+        # else is rejected (or handled) by invoke_tool itself
+        query = None
+        if isinstance(payload, dict) and payload.get("tool") == "agent_executor":
+            arguments = payload.get("arguments") or {}
+            if isinstance(arguments, dict):
+                query = arguments.get("query")
+
+        if query:
+            decision = evaluate_invoke_policy(
+                query=str(query),
+                max_query_chars=config.max_query_chars,
+                allowlisted_domains=config.allowlisted_domains,
+            )
+            if not decision.allowed:
+                response = ORJSONResponse(
+                    status_code=decision.status_code,
+                    content=_mcp_error(decision.reason or "Policy violation", code=decision.code),
+                )
+                return await response(scope, receive, send)
 
-    async def _receive():
-        return {"type": "http.request", "body": body_bytes, "more_body": False}
+        # Replay the buffered body for downstream request parsing
+        body_sent = False
 
-    # Replay body for downstream request parsing
-    request._receive = _receive  # type: ignore[attr-defined]
+        async def _receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body_bytes, "more_body": False}
+            return await receive()
 
-    try:
-        payload = json.loads(body_bytes.decode("utf-8"))
-    except Exception:
-        return JSONResponse(
-            status_code=400,
-            content=_mcp_error("Invalid JSON body", code="INVALID_JSON"),
-        )
+        await self.app(scope, _receive, send)
 
-    arguments = payload.get("arguments") or {}
-    query = arguments.get("query")
-    decision = evaluate_invoke_policy(
-        query=str(query) if query is not None else "",
-        max_query_chars=_config.max_query_chars,
-        allowlisted_domains=_config.allowlisted_domains,
-    )
-    if not decision.allowed:
-        return JSONResponse(
-            status_code=decision.status_code,
-            content=_mcp_error(decision.reason or "Policy violation", code=decision.code),
-        )
 
-    return await call_next(request)
+app.add_middleware(PolicyASGIMiddleware, get_config=lambda: _config)
 
 
 @app.on_event("startup")
@@ -191,12 +314,13 @@ async def startup_event():
     """Initialize the agent on server startup"""
     logger.info("Starting LangChain Agent MCP Server...")
     try:
-        global _config, _state_store
+        global _config, _state_store, _EXPECTED_AUTH
         _config = load_config()
+        _EXPECTED_AUTH = _expected_auth(_config)
 
         if _config.redis_url:
             try:
-                _state_store = RedisStateStore(_config.redis_url)
+                _state_store = await RedisStateStore.connect(_config.redis_url)
                 logger.info("State store: Redis enabled")
             except Exception as e:
                 _state_store = InMemoryStateStore()
@@ -208,7 +332,8 @@ async def startup_event():
         # Initialize the agent (lazy loading - will initialize on first use)
         # Don't fail startup if API key is missing - will fail on first request instead
         if os.getenv("OPENAI_API_KEY"):
-            agent = get_agent()
+            # The first build can pull the prompt from LangChain Hub
+            await anyio.to_thread.run_sync(get_agent)
             logger.info("Server started successfully. Agent ready.")
         else:
             logger.warning("OPENAI_API_KEY not set. Agent will initialize on first request.")
@@ -218,6 +343,22 @@ async def startup_event():
         # Don't raise - allow server to start, will fail on first request
         logger.warning("Server starting without agent pre-initialization")
 
+    # Launch the shared Playwright browser up front so the first snapshot is fast
+    if PLAYWRIGHT_AVAILABLE:
+        try:
+            await _get_browser()
+            logger.info("Playwright browser launched")
+        except Exception as e:
+            logger.warning(f"Could not launch Playwright browser, will retry on first snapshot: {e}")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release the shared Playwright browser and state store connections"""
+    if PLAYWRIGHT_AVAILABLE:
+        await _close_browser()
+    await _state_store.close()
+
 
 @app.get("/")
 async def root():
@@ -245,25 +386,12 @@ async def get_manifest():
     MCP Manifest Endpoint (FR1)
     
     Returns the MCP manifest JSON declaring the wrapped LangChain agent as a tool.
+    The manifest is read once at import and served from memory.
     """
     logger.info("GET /mcp/manifest - Returning manifest")
-    try:
-        manifest_path = os.path.join(
-            os.path.dirname(__file__),
-            "mcp_manifest.json"
-        )
-        with open(manifest_path, "r") as f:
-            manifest = json.load(f)
-        return manifest
-    except FileNotFoundError:
-        logger.error("Manifest file not found")
-        raise HTTPException(status_code=500, detail="Manifest file not found")
-    except json.JSONDecodeError as e:
-        logger.error(f"Invalid JSON in manifest: {e}")
-        raise HTTPException(status_code=500, detail="Invalid manifest format")
-    except Exception as e:
-        logger.error(f"Error loading manifest: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    if _MANIFEST_BYTES is None:
+        raise HTTPException(status_code=500, detail=_MANIFEST_ERROR or "Manifest not loaded")
+    return Response(content=_MANIFEST_BYTES, media_type="application/json")
 
 
 @app.get("/api/tasks")
@@ -275,18 +403,12 @@ async def list_tasks(
     Glazyr monitoring endpoint: returns safe task summaries.
     Never returns raw screenshot/base64 data.
     """
-    api_key = _config.api_key
-    if api_key and authorization != f"Bearer {api_key}":
+    if not _is_authorized(authorization):
         raise HTTPException(status_code=401, detail="Unauthorized - Invalid or missing API key")
 
     limit = max(1, min(200, int(limit)))
-    task_ids = _state_store.list_recent(limit)
-    tasks = []
-    for tid in task_ids:
-        rec = _state_store.get_task(tid)
-        if rec:
-            tasks.append(rec.to_dict())
-    return {"tasks": tasks}
+    records = await _state_store.list_recent_records(limit)
+    return {"tasks": [rec.to_dict() for rec in records]}
 
 
 @app.get("/api/tasks/{task_id}")
@@ -298,11 +420,10 @@ async def get_task(
     Glazyr monitoring endpoint: returns a safe single-task summary.
     Never returns raw screenshot/base64 data.
     """
-    api_key = _config.api_key
-    if api_key and authorization != f"Bearer {api_key}":
+    if not _is_authorized(authorization):
         raise HTTPException(status_code=401, detail="Unauthorized - Invalid or missing API key")
 
-    rec = _state_store.get_task(task_id)
+    rec = await _state_store.get_task(task_id)
     if not rec:
         raise HTTPException(status_code=404, detail="Task not found")
     return rec.to_dict()
@@ -322,8 +443,7 @@ async def invoke_tool(
     logger.info(f"POST /mcp/invoke - Tool: {request.tool}")
     
     # Optional API key authentication (NFR2)
-    api_key = _config.api_key
-    if api_key and authorization != f"Bearer {api_key}":
+    if not _is_authorized(authorization):
         logger.warning("Unauthorized request - invalid or missing API key")
         raise HTTPException(
             status_code=401,
@@ -333,7 +453,7 @@ async def invoke_tool(
     # Validate tool name
     if request.tool != "agent_executor":
         logger.warning(f"Unknown tool requested: {request.tool}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=400,
             content={
                 "error": f"Unknown tool: {request.tool}",
@@ -345,7 +465,7 @@ async def invoke_tool(
     query = request.arguments.get("query")
     if not query:
         logger.warning("Missing 'query' in arguments")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=400,
             content={
                 "error": "Missing required argument: 'query'",
@@ -361,41 +481,57 @@ async def invoke_tool(
     # Optional task_id for workflow resumption/monitoring (Glazyr)
     task_id = request.arguments.get("task_id") or str(uuid.uuid4())
     task_id = str(task_id)
+    q_str = str(query)
     
     logger.info(f"Executing agent with query: {query[:100]}...")
     
     try:
-        # Get the agent executor (with custom instruction if provided)
-        agent_executor = get_agent(system_instruction=system_instruction)
+        # Get the agent executor (with custom instruction if provided). Only
+        # building a new one (which can pull the prompt from LangChain Hub)
+        # leaves the event loop.
+        agent_executor = get_cached_agent(system_instruction)
+        if agent_executor is None:
+            agent_executor = await anyio.to_thread.run_sync(
+                partial(get_agent, system_instruction=system_instruction)
+            )
 
         # Track task state without storing raw query (no screenshot/base64 persistence)
         started = now_ts()
-        existing = _state_store.get_task(task_id)
+        existing = await _state_store.get_task(task_id)
         record = TaskRecord(
             task_id=task_id,
             created_at=existing.created_at if existing else started,
             updated_at=started,
             status="running",
             attempts=(existing.attempts + 1) if existing else 1,
-            query_preview=_preview(str(query), 500),
-            query_sha256=_sha256(str(query)),
+            query_preview=_preview(q_str, 500),
+            query_sha256=_sha256(q_str),
             last_output_preview=None,
             last_error=None,
         )
-        _state_store.put_task(record, ttl_seconds=_config.task_ttl_seconds)
-        _state_store.add_recent(task_id, max_items=_config.recent_tasks_max)
-
-        # Execute the agent (FR3) with retries and without blocking the event loop
-        @retry(
-            stop=stop_after_attempt(3),
-            wait=wait_exponential(multiplier=1, min=2, max=10),
-            retry=retry_if_exception_type(Exception),
-            reraise=True,
+        await _state_store.put_task_and_track(
+            record,
+            ttl_seconds=_config.task_ttl_seconds,
+            max_items=_config.recent_tasks_max,
         )
-        def _invoke_sync(q: str):
-            return agent_executor.invoke({"input": q})
 
-        result = await anyio.to_thread.run_sync(_invoke_sync, str(query))
+        # Execute the agent (FR3) with retries and without blocking the event loop.
+        # Native ainvoke lets concurrent requests overlap their LLM calls; agents
+        # without it fall back to a worker thread.
+        ainvoke = getattr(agent_executor, "ainvoke", None)
+        for attempt in range(_AGENT_MAX_ATTEMPTS):
+            try:
+                if ainvoke is not None:
+                    result = await ainvoke({"input": q_str})
+                else:
+                    result = await anyio.to_thread.run_sync(
+                        agent_executor.invoke, {"input": q_str}
+                    )
+                break
+            except _RETRYABLE_EXCEPTIONS:
+                if attempt == _AGENT_MAX_ATTEMPTS - 1:
+                    raise
+                await asyncio.sleep(_AGENT_RETRY_DELAY_SECONDS)
         
         # Extract the final answer
         final_answer = result.get("output", "No output generated")
@@ -407,7 +543,7 @@ async def invoke_tool(
         record.status = "succeeded"
         record.last_output_preview = _preview(final_answer, 1000)
         record.last_error = None
-        _state_store.put_task(record, ttl_seconds=_config.task_ttl_seconds)
+        await _state_store.put_task(record, ttl_seconds=_config.task_ttl_seconds)
         
         # Map result to MCP response format (FR4)
         return {
@@ -425,17 +561,17 @@ async def invoke_tool(
         logger.error(f"Error during agent execution: {e}", exc_info=True)
         try:
             finished = now_ts()
-            rec = _state_store.get_task(task_id)
+            rec = await _state_store.get_task(task_id)
             if rec:
                 rec.updated_at = finished
                 rec.status = "failed"
                 rec.last_error = _preview(str(e), 1000)
-                _state_store.put_task(rec, ttl_seconds=_config.task_ttl_seconds)
+                await _state_store.put_task(rec, ttl_seconds=_config.task_ttl_seconds)
         except Exception:
             # Never fail the request due to monitoring/state
             pass
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "content": [
@@ -449,11 +585,13 @@ async def invoke_tool(
         )
 
 
-# Simple in-memory cache for Playwright snapshots
-_playwright_cache: Dict[str, Dict[str, Any]] = {}
-_CACHE_POPULAR_SITES = ["amazon.com", "github.com", "google.com", "stackoverflow.com"]
+# In-memory LRU cache for Playwright snapshots (only popular sites are admitted)
+_playwright_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_PLAYWRIGHT_CACHE_MAX = 50
+_CACHE_POPULAR_SITES = re.compile(r"amazon\.com|github\.com|google\.com|stackoverflow\.com")
 
 
+@lru_cache(maxsize=1024)
 def _get_cache_key(url: str) -> str:
     """Generate a cache key from URL"""
     # Normalize URL
@@ -463,137 +601,155 @@ def _get_cache_key(url: str) -> str:
     return url_lower
 
 
+@lru_cache(maxsize=1024)
 def _is_popular_site(url: str) -> bool:
     """Check if URL is a popular site that should be cached"""
-    url_lower = url.lower()
-    return any(site in url_lower for site in _CACHE_POPULAR_SITES)
+    return _CACHE_POPULAR_SITES.search(url.lower()) is not None
+
+
+# In-page fallback that walks document.body and returns an accessibility-style tree
+_AX_TREE_JS = """
+    () => {
+        // Elements that never contribute to what a user can see or use
+        const SKIP_TAGS = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE', 'LINK', 'META']);
+
+        function getAccessibilityInfo(element) {
+            if (!element) return null;
+            if (SKIP_TAGS.has(element.tagName)) return null;
+            if (element.hidden || element.getAttribute('aria-hidden') === 'true') return null;
+
+            const role = element.getAttribute('role') ||
+                         (element.tagName ? element.tagName.toLowerCase() : 'unknown');
+            const name = element.getAttribute('aria-label') ||
+                        element.getAttribute('alt') ||
+                        element.textContent?.trim().substring(0, 100) || '';
+            const description = element.getAttribute('aria-description') || '';
+            const value = element.value || element.getAttribute('value') || '';
+            const checked = element.checked !== undefined ? element.checked : null;
+            const selected = element.selected !== undefined ? element.selected : null;
+
+            const info = {
+                role: role,
+                name: name,
+                description: description
+            };
+
+            if (value) info.value = value;
+            if (checked !== null) info.checked = checked;
+            if (selected !== null) info.selected = selected;
+
+            // Get children
+            const children = [];
+            for (let child of element.children || []) {
+                const childInfo = getAccessibilityInfo(child);
+                if (childInfo) children.push(childInfo);
+            }
 
+            if (children.length > 0) info.children = children;
+            return info;
+        }
 
-def _generate_accessibility_snapshot_sync(url: str) -> str:
+        return getAccessibilityInfo(document.body);
+    }
+"""
+
+
+async def _page_ax_tree(page) -> Optional[Dict[str, Any]]:
     """
-    Synchronous wrapper for generating accessibility snapshot.
-    This runs in a separate thread to avoid event loop conflicts on Windows.
-    Uses sync Playwright API to avoid async issues.
-    
-    Note: Even sync Playwright uses asyncio internally, so we must ensure
-    the thread has the correct event loop policy set.
+    Return the page's accessibility tree.
+
+    Uses Playwright's native accessibility snapshot (interesting nodes only).
+    Playwright releases that no longer ship ``page.accessibility`` fall back
+    to walking the DOM with _AX_TREE_JS, which applies a similar filter by
+    skipping scripts, styles and hidden subtrees.
     """
-    # Ensure this specific thread uses ProactorEventLoop if it triggers any internal async
-    # This is a safety measure in case the module-level policy wasn't applied
-    if sys.platform == 'win32':
-        asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
-    
-    try:
-        from playwright.sync_api import sync_playwright
-        
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(
-                viewport={"width": 1280, "height": 720},
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            )
-            page = context.new_page()
-            
-            try:
-                # Navigate to the page
-                page.goto(url, wait_until="networkidle", timeout=30000)
-                
-                # Get accessibility snapshot using JavaScript evaluation
-                ax_tree = page.evaluate("""
-                    () => {
-                        function getAccessibilityInfo(element) {
-                            if (!element) return null;
-                            
-                            const role = element.getAttribute('role') || 
-                                         (element.tagName ? element.tagName.toLowerCase() : 'unknown');
-                            const name = element.getAttribute('aria-label') || 
-                                        element.getAttribute('alt') ||
-                                        element.textContent?.trim().substring(0, 100) || '';
-                            const description = element.getAttribute('aria-description') || '';
-                            const value = element.value || element.getAttribute('value') || '';
-                            const checked = element.checked !== undefined ? element.checked : null;
-                            const selected = element.selected !== undefined ? element.selected : null;
-                            
-                            const info = {
-                                role: role,
-                                name: name,
-                                description: description,
-                                tag: element.tagName ? element.tagName.toLowerCase() : 'unknown'
-                            };
-                            
-                            if (value) info.value = value;
-                            if (checked !== null) info.checked = checked;
-                            if (selected !== null) info.selected = selected;
-                            
-                            // Get children
-                            const children = [];
-                            for (let child of element.children || []) {
-                                const childInfo = getAccessibilityInfo(child);
-                                if (childInfo) children.push(childInfo);
-                            }
-                            
-                            if (children.length > 0) info.children = children;
-                            return info;
-                        }
-                        
-                        return getAccessibilityInfo(document.body);
-                    }
-                """)
-                
-                # Format the accessibility tree
-                def format_node(node: Dict[str, Any], indent: int = 0) -> str:
-                    """Recursively format accessibility tree nodes"""
-                    if not node:
-                        return ""
-                    
-                    prefix = "  " * indent
-                    role = node.get("role", "unknown")
-                    name = node.get("name", "")
-                    description = node.get("description", "")
-                    
-                    lines = [f"{prefix}[{role}]"]
-                    if name:
-                        lines.append(f"{prefix}  Name: {name}")
-                    if description:
-                        lines.append(f"{prefix}  Description: {description}")
-                    
-                    # Add other relevant properties
-                    for prop_key in ["value", "checked", "selected"]:
-                        if prop_key in node and node[prop_key] is not None:
-                            lines.append(f"{prefix}  {prop_key.capitalize()}: {node[prop_key]}")
-                    
-                    # Recursively process children
-                    children = node.get("children", [])
-                    for child in children:
-                        child_output = format_node(child, indent + 1)
-                        if child_output:
-                            lines.append(child_output)
-                    
-                    return "\n".join(lines)
-                
-                formatted_snapshot = format_node(ax_tree) if ax_tree else "No accessibility tree available"
-                return formatted_snapshot
-                
-            finally:
-                browser.close()
-    except Exception as e:
-        # Re-raise to be caught by outer handler
-        raise
+    accessibility = getattr(page, "accessibility", None)
+    if accessibility is not None:
+        return await accessibility.snapshot(interesting_only=True)
+    return await page.evaluate(_AX_TREE_JS)
 
 
-async def _generate_accessibility_snapshot_async(url: str) -> str:
+def _format_ax_tree(ax_tree: Optional[Dict[str, Any]]) -> str:
     """
-    Generate a structured accessibility snapshot using Playwright.
-    Returns a text representation of the page's accessibility tree.
+    Format an accessibility tree as indented text.
+
+    Walks the tree with an explicit stack rather than recursion, so very deep
+    pages cannot hit the interpreter's recursion limit, and writes every line
+    into one flat list joined once at the end.
     """
-    if not PLAYWRIGHT_AVAILABLE:
-        raise Exception("Playwright is not available. Please install playwright: pip install playwright && playwright install")
-    
-    try:
-        # Launch Playwright - the event loop policy is already set at module level
-        async with async_playwright() as p:
+    if not ax_tree:
+        return "No accessibility tree available"
+
+    out: List[str] = []
+    prefixes: List[str] = []
+    stack = [(ax_tree, 0)]
+    while stack:
+        node, indent = stack.pop()
+        if not node:
+            continue
+
+        while len(prefixes) <= indent:
+            prefixes.append("  " * len(prefixes))
+        prefix = prefixes[indent]
+        out.append(f"{prefix}[{node.get('role', 'unknown')}]")
+        name = node.get("name", "")
+        if name:
+            out.append(f"{prefix}  Name: {name}")
+        description = node.get("description", "")
+        if description:
+            out.append(f"{prefix}  Description: {description}")
+
+        # Add other relevant properties
+        for prop_key in ("value", "checked", "selected"):
+            if node.get(prop_key) is not None:
+                out.append(f"{prefix}  {prop_key.capitalize()}: {node[prop_key]}")
+
+        children = node.get("children")
+        if children:
+            # Reversed so the first child is popped (and printed) first
+            stack.extend((child, indent + 1) for child in reversed(children))
+    return "\n".join(out)
+
+
+# Shared Playwright driver and Chromium instance, reused by all snapshots
+_playwright = None
+_browser = None
+_browser_lock = asyncio.Lock()
+
+# Each browser context costs tens of MB; cap concurrent snapshots so bursts
+# queue up instead of exhausting memory
+_PLAYWRIGHT_MAX_CONCURRENCY = _config.playwright_max_concurrency
+_playwright_semaphore = asyncio.Semaphore(_PLAYWRIGHT_MAX_CONCURRENCY)
+# Hard cap on a single navigation, slightly above Playwright's own timeout
+_NAVIGATION_TIMEOUT_SECONDS = 35
+# Upper bound on waiting for dynamic content after navigation
+_SETTLE_TIMEOUT_MS = 2000
+
+# Browser context settings shared by every snapshot
+_CONTEXT_OPTIONS: Dict[str, Any] = {
+    "viewport": {"width": 1280, "height": 720},
+    "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "locale": "en-US",
+    "timezone_id": "America/New_York",
+}
+
+# Remove webdriver property to avoid detection
+_STEALTH_JS = """
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    });
+"""
+
+
+async def _get_browser():
+    """Return the shared Chromium browser, launching it on first use or after a crash"""
+    global _playwright, _browser
+    async with _browser_lock:
+        if _browser is None or not _browser.is_connected():
+            if _playwright is None:
+                _playwright = await async_playwright().start()
             # Use more realistic browser settings to avoid bot detection
-            browser = await p.chromium.launch(
+            _browser = await _playwright.chromium.launch(
                 headless=True,
                 args=[
                     '--disable-blink-features=AutomationControlled',
@@ -601,123 +757,91 @@ async def _generate_accessibility_snapshot_async(url: str) -> str:
                     '--no-sandbox'
                 ]
             )
-            context = await browser.new_context(
-                viewport={"width": 1280, "height": 720},
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                locale="en-US",
-                timezone_id="America/New_York"
-            )
-            
-            # Remove webdriver property to avoid detection
-            await context.add_init_script("""
-                Object.defineProperty(navigator, 'webdriver', {
-                    get: () => undefined
-                });
-            """)
-            
+        return _browser
+
+
+async def _close_browser() -> None:
+    """Close the shared browser and stop the Playwright driver"""
+    global _playwright, _browser
+    async with _browser_lock:
+        if _browser is not None:
+            try:
+                await _browser.close()
+            except Exception as e:
+                logger.warning(f"Error closing Playwright browser: {e}")
+            _browser = None
+        if _playwright is not None:
+            try:
+                await _playwright.stop()
+            except Exception as e:
+                logger.warning(f"Error stopping Playwright: {e}")
+            _playwright = None
+
+
+async def _wait_for_settle(page) -> None:
+    """
+    Give client-side rendering a chance to finish.
+
+    Returns as soon as the network goes idle, or after _SETTLE_TIMEOUT_MS on
+    pages that keep connections open (x.com and friends never go idle).
+    """
+    try:
+        await page.wait_for_load_state("networkidle", timeout=_SETTLE_TIMEOUT_MS)
+    except Exception:
+        pass
+
+
+async def _generate_accessibility_snapshot_async(url: str) -> str:
+    """
+    Generate a structured accessibility snapshot using Playwright.
+    Returns a text representation of the page's accessibility tree.
+
+    Each snapshot gets its own browser context on the shared browser, so no
+    cookies or storage leak between requests.
+    """
+    if not PLAYWRIGHT_AVAILABLE:
+        raise Exception("Playwright is not available. Please install playwright: pip install playwright && playwright install")
+    
+    async with _playwright_semaphore:
+        browser = await _get_browser()
+        context = await browser.new_context(**_CONTEXT_OPTIONS)
+        
+        try:
+            await context.add_init_script(_STEALTH_JS)
+        
             page = await context.new_page()
-            
+        
+            # Navigate to the page with more lenient wait condition
+            # Some sites (like x.com) may never reach "networkidle"
             try:
-                # Navigate to the page with more lenient wait condition
-                # Some sites (like x.com) may never reach "networkidle"
-                try:
-                    await page.goto(url, wait_until="domcontentloaded", timeout=30000)
-                    # Wait a bit for dynamic content
-                    await page.wait_for_timeout(2000)
-                except Exception as nav_error:
-                    # If navigation fails, try with load event instead
-                    logger.warning(f"Navigation with domcontentloaded failed, trying load: {nav_error}")
-                    await page.goto(url, wait_until="load", timeout=30000)
-                    await page.wait_for_timeout(2000)
-                
-                # Get accessibility snapshot using JavaScript evaluation
-                # This extracts structured information from the DOM
-                ax_tree = await page.evaluate("""
-                    () => {
-                        function getAccessibilityInfo(element) {
-                            if (!element) return null;
-                            
-                            const role = element.getAttribute('role') || 
-                                         (element.tagName ? element.tagName.toLowerCase() : 'unknown');
-                            const name = element.getAttribute('aria-label') || 
-                                        element.getAttribute('alt') ||
-                                        element.textContent?.trim().substring(0, 100) || '';
-                            const description = element.getAttribute('aria-description') || '';
-                            const value = element.value || element.getAttribute('value') || '';
-                            const checked = element.checked !== undefined ? element.checked : null;
-                            const selected = element.selected !== undefined ? element.selected : null;
-                            
-                            const info = {
-                                role: role,
-                                name: name,
-                                description: description,
-                                tag: element.tagName ? element.tagName.toLowerCase() : 'unknown'
-                            };
-                            
-                            if (value) info.value = value;
-                            if (checked !== null) info.checked = checked;
-                            if (selected !== null) info.selected = selected;
-                            
-                            // Get children
-                            const children = [];
-                            for (let child of element.children || []) {
-                                const childInfo = getAccessibilityInfo(child);
-                                if (childInfo) children.push(childInfo);
-                            }
-                            
-                            if (children.length > 0) info.children = children;
-                            return info;
-                        }
-                        
-                        return getAccessibilityInfo(document.body);
-                    }
-                """)
-                
-                # Format the accessibility tree
-                def format_node(node: Dict[str, Any], indent: int = 0) -> str:
-                    """Recursively format accessibility tree nodes"""
-                    if not node:
-                        return ""
-                    
-                    prefix = "  " * indent
-                    role = node.get("role", "unknown")
-                    name = node.get("name", "")
-                    description = node.get("description", "")
-                    
-                    lines = [f"{prefix}[{role}]"]
-                    if name:
-                        lines.append(f"{prefix}  Name: {name}")
-                    if description:
-                        lines.append(f"{prefix}  Description: {description}")
-                    
-                    # Add other relevant properties
-                    for prop_key in ["value", "checked", "selected"]:
-                        if prop_key in node and node[prop_key] is not None:
-                            lines.append(f"{prefix}  {prop_key.capitalize()}: {node[prop_key]}")
-                    
-                    # Recursively process children
-                    children = node.get("children", [])
-                    for child in children:
-                        child_output = format_node(child, indent + 1)
-                        if child_output:
-                            lines.append(child_output)
-                    
-                    return "\n".join(lines)
-                
-                formatted_snapshot = format_node(ax_tree) if ax_tree else "No accessibility tree available"
-                return formatted_snapshot
-                
-            finally:
-                await browser.close()
-    except Exception as e:
-        # Re-raise to be caught by outer handler
-        raise
+                await asyncio.wait_for(
+                    page.goto(url, wait_until="domcontentloaded", timeout=30000),
+                    timeout=_NAVIGATION_TIMEOUT_SECONDS,
+                )
+                await _wait_for_settle(page)
+            except Exception as nav_error:
+                # If navigation fails, try with load event instead
+                logger.warning(f"Navigation with domcontentloaded failed, trying load: {nav_error}")
+                await asyncio.wait_for(
+                    page.goto(url, wait_until="load", timeout=30000),
+                    timeout=_NAVIGATION_TIMEOUT_SECONDS,
+                )
+                await _wait_for_settle(page)
+        
+            # Get the platform accessibility tree in one round-trip
+            ax_tree = await _page_ax_tree(page)
+        
+            return _format_ax_tree(ax_tree)
+        
+        finally:
+            await context.close()
 
 
 async def _generate_accessibility_snapshot(url: str) -> str:
     """
     Generate a structured accessibility snapshot using Playwright.
-    Now uses async Playwright directly since we're using ProactorEventLoop on Windows.
+    Uses async Playwright directly since we're using ProactorEventLoop on Windows,
+    and maps failures to user-facing HTTP errors.
     """
     if not PLAYWRIGHT_AVAILABLE:
         raise HTTPException(
@@ -784,10 +908,11 @@ async def get_playwright_snapshot(request: PlaywrightSnapshotRequest):
     cache_key = _get_cache_key(url)
     cached = False
     
-    # Check cache if enabled and for popular sites
-    if request.use_cache and _is_popular_site(url):
-        if cache_key in _playwright_cache:
-            cached_data = _playwright_cache[cache_key]
+    # Check cache if enabled
+    if request.use_cache:
+        cached_data = _playwright_cache.get(cache_key)
+        if cached_data is not None:
+            _playwright_cache.move_to_end(cache_key)
             logger.info(f"Returning cached snapshot for {url}")
             return PlaywrightSnapshotResponse(
                 snapshot=cached_data["snapshot"],
@@ -807,11 +932,10 @@ async def get_playwright_snapshot(request: PlaywrightSnapshotRequest):
             "url": url,
             "token_count": token_count
         }
-        # Limit cache size (keep last 50 entries)
-        if len(_playwright_cache) > 50:
-            # Remove oldest entry (simple FIFO)
-            oldest_key = next(iter(_playwright_cache))
-            del _playwright_cache[oldest_key]
+        _playwright_cache.move_to_end(cache_key)
+        # Evict least recently used entries
+        while len(_playwright_cache) > _PLAYWRIGHT_CACHE_MAX:
+            _playwright_cache.popitem(last=False)
     
     return PlaywrightSnapshotResponse(
         snapshot=snapshot,
@@ -821,6 +945,52 @@ async def get_playwright_snapshot(request: PlaywrightSnapshotRequest):
     )
 
 
+# Prompt substrings and the snapshot keywords they look for
+_PROMPT_TRIGGERS: Dict[str, Tuple[str, ...]] = {
+    "login": ("button", "login", "sign in", "submit"),
+    "sign in": ("button", "login", "sign in", "submit"),
+    "button": ("button",),
+    "link": ("link",),
+    "input": ("input", "textbox", "field"),
+    "field": ("input", "textbox", "field"),
+}
+
+
+@lru_cache(maxsize=64)
+def _keyword_pattern(keywords: Tuple[str, ...]) -> "re.Pattern[str]":
+    """Compile one alternation over all keywords so a line is scanned once"""
+    return re.compile("|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)))
+
+
+def _matching_line_indices(text_lower: str, keywords: Tuple[str, ...]) -> List[int]:
+    """
+    Return the indices of lines in text_lower that contain any keyword.
+
+    Searches the whole text with a single compiled pattern and jumps to the
+    next line after each hit, instead of testing every keyword on every line.
+    Line numbers come from str.count/str.find over the gaps between hits, so
+    no per-line index is built.
+    """
+    if not keywords:
+        return []
+    pattern = _keyword_pattern(keywords)
+
+    hits = []
+    line = 0
+    pos = 0
+    while True:
+        m = pattern.search(text_lower, pos)
+        if m is None:
+            break
+        line += text_lower.count("\n", pos, m.start())
+        hits.append(line)
+        pos = text_lower.find("\n", m.end()) + 1
+        if pos == 0:
+            break
+        line += 1
+    return hits
+
+
 @app.post("/api/playwright/test-prompt")
 async def test_playwright_prompt(request: Dict[str, Any]):
     """
@@ -835,34 +1005,27 @@ async def test_playwright_prompt(request: Dict[str, Any]):
     
     # Simple keyword matching (in a real implementation, this would use an LLM)
     prompt_lower = prompt.lower()
-    keywords = []
+    keywords = set()
+    for trigger, trigger_keywords in _PROMPT_TRIGGERS.items():
+        if trigger in prompt_lower:
+            keywords.update(trigger_keywords)
     
-    # Extract keywords from prompt
-    if "login" in prompt_lower or "sign in" in prompt_lower:
-        keywords.extend(["button", "login", "sign in", "submit"])
-    if "button" in prompt_lower:
-        keywords.append("button")
-    if "link" in prompt_lower:
-        keywords.append("link")
-    if "input" in prompt_lower or "field" in prompt_lower:
-        keywords.extend(["input", "textbox", "field"])
-    
-    # Find matching lines in snapshot
+    # Find matching lines in snapshot; only the first 10 are returned
+    hits = _matching_line_indices(snapshot.lower(), tuple(sorted(keywords)))
     lines = snapshot.split("\n")
-    matches = []
-    for i, line in enumerate(lines):
-        line_lower = line.lower()
-        if any(keyword in line_lower for keyword in keywords):
-            matches.append({
-                "line": i + 1,
-                "content": line.strip(),
-                "context": "\n".join(lines[max(0, i-2):min(len(lines), i+3)])
-            })
+    matches = [
+        {
+            "line": i + 1,
+            "content": lines[i].strip(),
+            "context": "\n".join(lines[max(0, i-2):min(len(lines), i+3)])
+        }
+        for i in hits[:10]
+    ]
     
     return {
-        "matches": matches[:10],  # Limit to 10 matches
+        "matches": matches,
         "prompt": prompt,
-        "total_matches": len(matches)
+        "total_matches": len(hits)
     }
 
 
@@ -870,5 +1033,47 @@ if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", "8000"))
     host = os.getenv("HOST", "0.0.0.0")
-    uvicorn.run(app, host=host, port=port)
+
+    # uvloop (libuv event loop) is POSIX-only; Windows keeps the Proactor loop
+    # configured above so Playwright can spawn subprocesses
+    loop = "asyncio"
+    if sys.platform != "win32":
+        try:
+            import uvloop  # noqa: F401
+            loop = "uvloop"
+        except ImportError:
+            logger.info("uvloop not installed, using the default asyncio loop")
+
+    try:
+        import httptools  # noqa: F401
+        http = "httptools"
+    except ImportError:
+        http = "h11"
+
+    # Each worker is a separate process with its own agent, Chromium instance,
+    # snapshot semaphore and (without REDIS_URL) its own in-memory task store,
+    # so only fan out by default when task state is shared through Redis
+    default_workers = (os.cpu_count() or 1) if _config.redis_url else 1
+    workers = int(os.getenv("WORKERS", str(default_workers)))
+    if workers > 1 and not _config.redis_url:
+        logger.warning(
+            f"WORKERS={workers} without REDIS_URL: task resumption and /api/tasks "
+            "only see the worker that handled each request"
+        )
+    if workers > 1 and PLAYWRIGHT_AVAILABLE:
+        logger.info(
+            f"Each of the {workers} workers launches its own Chromium with up to "
+            f"{_PLAYWRIGHT_MAX_CONCURRENCY} concurrent snapshot contexts"
+        )
+
+    uvicorn.run(
+        "src.main:app",
+        host=host,
+        port=port,
+        loop=loop,
+        http=http,
+        workers=workers,
+        limit_concurrency=int(os.getenv("LIMIT_CONCURRENCY", "1000")),
+        timeout_keep_alive=30,
+    )
 
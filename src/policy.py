@@ -0,0 +1,120 @@
+"""
+Invoke Policy
+
+This module implements the request policy applied to /mcp/invoke before the
+agent runs: a query length limit and an optional domain allowlist for URLs
+mentioned in the query.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import FrozenSet, Iterable, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Everything after "scheme://" up to whitespace, a closing paren, a quote or
+# an angle bracket
+_URL_TAIL_RE = re.compile(r"[^\s)\"'<>]+")
+
+
+@dataclass(frozen=True)
+class PolicyDecision:
+    """Outcome of a policy evaluation"""
+    allowed: bool
+    status_code: int = 200
+    reason: Optional[str] = None
+    code: Optional[str] = None
+
+
+def _extract_urls(text: str) -> Iterator[str]:
+    """
+    Yield http(s) URLs in text, in order.
+
+    Lazy so callers can stop at the first URL they reject. Candidates are
+    located with str.find("://"), so text without URLs never enters the
+    regex engine; the scheme is checked case-insensitively by slicing.
+    """
+    if not text:
+        return
+    pos = 0
+    while True:
+        i = text.find("://", pos)
+        if i < 0:
+            return
+        if text[max(0, i - 5):i].lower() == "https":
+            start = i - 5
+        elif text[max(0, i - 4):i].lower() == "http":
+            start = i - 4
+        else:
+            pos = i + 3
+            continue
+        m = _URL_TAIL_RE.match(text, i + 3)
+        if m is None:
+            pos = i + 3
+            continue
+        yield text[start:m.end()]
+        pos = m.end()
+
+
+@lru_cache(maxsize=4096)
+def _domain_of(url: str) -> Optional[str]:
+    try:
+        # urlsplit drops userinfo, port, query and fragment and lower-cases
+        return urlsplit(url).hostname or None
+    except ValueError:
+        # Malformed netloc (e.g. an unclosed IPv6 bracket): keep the raw
+        # authority so the allowlist still rejects it
+        return url.split("://", 1)[-1].split("/", 1)[0].lower() or None
+
+
+@lru_cache(maxsize=16)
+def _allowlist_matchers(allowlisted_domains: FrozenSet[str]) -> Tuple[FrozenSet[str], Tuple[str, ...]]:
+    """Exact-match set and dot-prefixed suffixes for an allowlist (built once per allowlist)"""
+    domains = frozenset(d.lower() for d in allowlisted_domains)
+    return domains, tuple("." + d for d in domains)
+
+
+def _host_allowed(host: str, domains: FrozenSet[str], suffixes: Tuple[str, ...]) -> bool:
+    return host in domains or host.endswith(suffixes)
+
+
+def evaluate_invoke_policy(
+    query: str,
+    max_query_chars: int,
+    allowlisted_domains: Iterable[str],
+) -> PolicyDecision:
+    """
+    Evaluate the invoke policy for a query.
+
+    Args:
+        query: The user query
+        max_query_chars: Maximum allowed query length
+        allowlisted_domains: Domains URLs in the query may point to
+            (empty means any domain is allowed)
+
+    Returns:
+        PolicyDecision describing whether the request may proceed
+    """
+    if len(query) > max_query_chars:
+        return PolicyDecision(
+            allowed=False,
+            status_code=413,
+            reason=f"Query exceeds maximum length of {max_query_chars} characters",
+            code="QUERY_TOO_LONG",
+        )
+
+    if allowlisted_domains:
+        # frozenset() is a no-op for the config's allowlist, which keeps the cache key stable
+        domains, suffixes = _allowlist_matchers(frozenset(allowlisted_domains))
+        # Stops at the first disallowed URL instead of scanning the whole query
+        for url in _extract_urls(query):
+            host = _domain_of(url)
+            if host and not _host_allowed(host, domains, suffixes):
+                return PolicyDecision(
+                    allowed=False,
+                    status_code=403,
+                    reason=f"Domain not allowlisted: {host}",
+                    code="DOMAIN_NOT_ALLOWED",
+                )
+
+    return PolicyDecision(allowed=True)
@@ -0,0 +1,231 @@
+"""
+Task State Store
+
+This module persists task summaries for workflow resumption and the Glazyr
+monitoring endpoints. Records never contain raw screenshots or base64 data,
+only short previews and a hash of the query.
+"""
+
+import time
+from collections import OrderedDict
+from itertools import islice
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+
+def now_ts() -> float:
+    """Current UNIX timestamp in seconds"""
+    return time.time()
+
+
+@dataclass(slots=True)
+class TaskRecord:
+    """Safe summary of a single agent task"""
+    task_id: str
+    created_at: float
+    updated_at: float
+    status: str
+    attempts: int
+    query_preview: str
+    query_sha256: str
+    last_output_preview: Optional[str] = None
+    last_error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "task_id": self.task_id,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "status": self.status,
+            "attempts": self.attempts,
+            "query_preview": self.query_preview,
+            "query_sha256": self.query_sha256,
+            "last_output_preview": self.last_output_preview,
+            "last_error": self.last_error,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TaskRecord":
+        return cls(
+            task_id=str(data["task_id"]),
+            created_at=float(data["created_at"]),
+            updated_at=float(data["updated_at"]),
+            status=str(data["status"]),
+            attempts=int(data.get("attempts", 1)),
+            query_preview=str(data.get("query_preview", "")),
+            query_sha256=str(data.get("query_sha256", "")),
+            last_output_preview=data.get("last_output_preview"),
+            last_error=data.get("last_error"),
+        )
+
+
+class StateStore:
+    """Interface for task state backends (all methods are coroutines)"""
+
+    async def put_task(self, record: TaskRecord, ttl_seconds: int) -> None:
+        raise NotImplementedError
+
+    async def get_task(self, task_id: str) -> Optional[TaskRecord]:
+        raise NotImplementedError
+
+    async def get_tasks(self, task_ids: List[str]) -> List[Optional[TaskRecord]]:
+        """Fetch several tasks in one backend call (None for missing ids)."""
+        return [await self.get_task(task_id) for task_id in task_ids]
+
+    async def add_recent(self, task_id: str, max_items: int) -> None:
+        raise NotImplementedError
+
+    async def put_task_and_track(self, record: TaskRecord, ttl_seconds: int, max_items: int) -> None:
+        """Store a task and mark it as most recent in a single backend operation."""
+        await self.put_task(record, ttl_seconds)
+        await self.add_recent(record.task_id, max_items)
+
+    async def list_recent(self, limit: int) -> List[str]:
+        raise NotImplementedError
+
+    async def list_recent_records(self, limit: int) -> List[TaskRecord]:
+        """Most recent task records, newest first, skipping expired ones."""
+        records = await self.get_tasks(await self.list_recent(limit))
+        return [record for record in records if record]
+
+    async def close(self) -> None:
+        """Release backend resources."""
+
+
+class InMemoryStateStore(StateStore):
+    """Process-local state store (default when REDIS_URL is not set)"""
+
+    def __init__(self, max_tasks: int = 10000):
+        # task_id -> (expires_at, record), least recently used first. Expired
+        # records are dropped lazily on access; the size cap evicts the rest.
+        self._tasks: "OrderedDict[str, Tuple[float, TaskRecord]]" = OrderedDict()
+        self._max_tasks = max_tasks
+        # Recent task ids, oldest first (newest at the end)
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+
+    def _lookup(self, task_id: str, now: float) -> Optional[TaskRecord]:
+        entry = self._tasks.get(task_id)
+        if entry is None:
+            return None
+        expires_at, record = entry
+        if expires_at <= now:
+            del self._tasks[task_id]
+            return None
+        self._tasks.move_to_end(task_id)
+        return record
+
+    async def put_task(self, record: TaskRecord, ttl_seconds: int) -> None:
+        self._tasks[record.task_id] = (now_ts() + ttl_seconds, record)
+        self._tasks.move_to_end(record.task_id)
+        while len(self._tasks) > self._max_tasks:
+            self._tasks.popitem(last=False)
+
+    async def get_task(self, task_id: str) -> Optional[TaskRecord]:
+        return self._lookup(task_id, now_ts())
+
+    async def get_tasks(self, task_ids: List[str]) -> List[Optional[TaskRecord]]:
+        now = now_ts()
+        return [self._lookup(task_id, now) for task_id in task_ids]
+
+    async def add_recent(self, task_id: str, max_items: int) -> None:
+        self._recent.pop(task_id, None)
+        self._recent[task_id] = None
+        while len(self._recent) > max_items:
+            self._recent.popitem(last=False)
+
+    async def list_recent(self, limit: int) -> List[str]:
+        return list(islice(reversed(self._recent), limit))
+
+
+# Move a task id to the head of the recent list and trim it, atomically and
+# in a single command (KEYS[1] = list, ARGV[1] = task id, ARGV[2] = max items)
+_ADD_RECENT_LUA = """
+redis.call('LREM', KEYS[1], 0, ARGV[1])
+redis.call('LPUSH', KEYS[1], ARGV[1])
+redis.call('LTRIM', KEYS[1], 0, tonumber(ARGV[2]) - 1)
+"""
+
+# Store a task record and move it to the head of the recent list, atomically
+# and in a single command (KEYS[1] = task key, KEYS[2] = list, ARGV[1] =
+# record JSON, ARGV[2] = TTL seconds, ARGV[3] = task id, ARGV[4] = max items)
+_PUT_AND_TRACK_LUA = """
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+redis.call('LREM', KEYS[2], 0, ARGV[3])
+redis.call('LPUSH', KEYS[2], ARGV[3])
+redis.call('LTRIM', KEYS[2], 0, tonumber(ARGV[4]) - 1)
+"""
+
+
+class RedisStateStore(StateStore):
+    """
+    Redis-backed state store shared across instances.
+
+    Uses redis.asyncio on a shared connection pool so concurrent requests
+    never block the event loop on Redis round-trips. Create instances with
+    ``await RedisStateStore.connect(url)``.
+    """
+
+    def __init__(self, redis_url: str, max_connections: int = 50):
+        import redis.asyncio as aioredis
+
+        # Replies stay as bytes: orjson parses them directly, so decoding every
+        # payload to str first would only add a copy
+        self._pool = aioredis.ConnectionPool.from_url(
+            redis_url, max_connections=max_connections, decode_responses=False
+        )
+        self._r = aioredis.Redis(connection_pool=self._pool)
+        self._add_recent_script = self._r.register_script(_ADD_RECENT_LUA)
+        self._put_and_track_script = self._r.register_script(_PUT_AND_TRACK_LUA)
+
+    @classmethod
+    async def connect(cls, redis_url: str, max_connections: int = 50) -> "RedisStateStore":
+        """Create a store and check connectivity, so callers can fall back early."""
+        store = cls(redis_url, max_connections=max_connections)
+        try:
+            await store._r.ping()
+        except Exception:
+            await store.close()
+            raise
+        return store
+
+    async def put_task(self, record: TaskRecord, ttl_seconds: int) -> None:
+        await self._r.set(f"task:{record.task_id}", orjson.dumps(record.to_dict()), ex=ttl_seconds)
+
+    async def get_task(self, task_id: str) -> Optional[TaskRecord]:
+        raw = await self._r.get(f"task:{task_id}")
+        if not raw:
+            return None
+        return TaskRecord.from_dict(orjson.loads(raw))
+
+    async def get_tasks(self, task_ids: List[str]) -> List[Optional[TaskRecord]]:
+        if not task_ids:
+            return []
+        raws = await self._r.mget([f"task:{task_id}" for task_id in task_ids])
+        return [TaskRecord.from_dict(orjson.loads(raw)) if raw else None for raw in raws]
+
+    async def add_recent(self, task_id: str, max_items: int) -> None:
+        await self._add_recent_script(keys=["recent_tasks"], args=[task_id, max_items])
+
+    async def list_recent(self, limit: int) -> List[str]:
+        return [task_id.decode() for task_id in await self._r.lrange("recent_tasks", 0, limit - 1)]
+
+    async def list_recent_records(self, limit: int) -> List[TaskRecord]:
+        # LRANGE then MGET: two round-trips for any limit, and the raw ids are
+        # turned into keys without decoding them
+        task_ids = await self._r.lrange("recent_tasks", 0, limit - 1)
+        if not task_ids:
+            return []
+        raws = await self._r.mget([b"task:" + task_id for task_id in task_ids])
+        return [TaskRecord.from_dict(orjson.loads(raw)) for raw in raws if raw]
+
+    async def put_task_and_track(self, record: TaskRecord, ttl_seconds: int, max_items: int) -> None:
+        await self._put_and_track_script(
+            keys=[f"task:{record.task_id}", "recent_tasks"],
+            args=[orjson.dumps(record.to_dict()), ttl_seconds, record.task_id, max_items],
+        )
+
+    async def close(self) -> None:
+        await self._r.aclose()
+        await self._pool.aclose()
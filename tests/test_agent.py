@@ -0,0 +1,115 @@
+"""
+Tests for the LangChain Agent
+
+This module contains tests for agent construction and per-instruction
+executor caching. No LLM or network calls are made.
+"""
+
+import pytest
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain.prompts import PromptTemplate
+
+from src import agent
+
+_BASE_PROMPT = PromptTemplate.from_template(
+    "Tools: {tools} ({tool_names})\nQuestion: {input}\nThought: {agent_scratchpad}"
+)
+
+
+@pytest.fixture
+def fake_components(monkeypatch):
+    """Replace the LLM/hub-backed components with local fakes"""
+    builds = []
+
+    def _build():
+        builds.append(1)
+        llm = FakeListChatModel(responses=["Final Answer: ok"])
+        return llm, agent.create_agent_tools(), _BASE_PROMPT
+
+    monkeypatch.setattr(agent, "_build_components", _build)
+    monkeypatch.setattr(agent, "_components", None)
+    monkeypatch.setattr(agent, "_agent_executor", None)
+    monkeypatch.setattr(agent, "_instruction_agents", OrderedDict())
+    return builds
+
+
+def test_components_built_once(fake_components):
+    """Test the LLM, tools and prompt are shared by all executors"""
+    default = agent.get_agent()
+    custom = agent.get_agent(system_instruction="Be brief.")
+    assert default is not custom
+    assert agent.get_agent() is default
+    assert len(fake_components) == 1
+
+
+def test_instruction_executors_are_cached(fake_components):
+    """Test repeated instructions reuse their executor"""
+    first = agent.get_agent(system_instruction="Be brief.")
+    assert agent.get_agent(system_instruction="Be brief.") is first
+    assert agent.get_agent(system_instruction="Be verbose.") is not first
+
+
+def test_cached_agent_never_builds(fake_components):
+    """Test get_cached_agent only returns executors get_agent already built"""
+    assert agent.get_cached_agent() is None
+    assert agent.get_cached_agent("Be brief.") is None
+    assert fake_components == []
+    default = agent.get_agent()
+    custom = agent.get_agent(system_instruction="Be brief.")
+    assert agent.get_cached_agent() is default
+    assert agent.get_cached_agent("Be brief.") is custom
+
+
+def test_instruction_cache_is_bounded(fake_components, monkeypatch):
+    """Test the least recently used instruction is evicted"""
+    monkeypatch.setattr(agent, "_INSTRUCTION_CACHE_SIZE", 2)
+    agent.get_agent(system_instruction="a")
+    agent.get_agent(system_instruction="b")
+    agent.get_cached_agent("a")
+    agent.get_agent(system_instruction="c")
+    assert list(agent._instruction_agents) == ["a", "c"]
+
+
+def test_concurrent_cold_starts_build_once(fake_components, monkeypatch):
+    """Test threads racing on a cold get_agent() share one executor"""
+    builds = []
+    original = agent.initialize_agent
+    barrier = threading.Barrier(8)
+
+    def _slow_initialize():
+        builds.append(1)
+        time.sleep(0.05)  # widen the race window
+        return original()
+
+    monkeypatch.setattr(agent, "initialize_agent", _slow_initialize)
+
+    def _get(_):
+        barrier.wait()
+        return agent.get_agent()
+
+    with ThreadPoolExecutor(8) as pool:
+        executors = list(pool.map(_get, range(8)))
+    assert len(builds) == 1
+    assert all(e is executors[0] for e in executors)
+
+
+def test_instruction_prompt_keeps_braces_literal():
+    """Test the instruction leads the prompt and braces are not variables"""
+    prompt = agent._instruction_prompt(_BASE_PROMPT, "Reply as {json}.")
+    assert set(prompt.input_variables) == set(_BASE_PROMPT.input_variables)
+    rendered = prompt.format(tools="t", tool_names="n", input="q", agent_scratchpad="")
+    assert rendered.startswith("Reply as {json}.\n\nTools: t")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
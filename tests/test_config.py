@@ -0,0 +1,118 @@
+"""
+Tests for Runtime Configuration
+
+This module contains tests for environment parsing in src.config.
+"""
+
+import pytest
+import os
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src import config
+
+
+@pytest.fixture
+def env(monkeypatch):
+    """Set environment variables and refresh the config snapshot"""
+    def _set(**values):
+        for name, value in values.items():
+            monkeypatch.setenv(name, value)
+        config.refresh_env_cache()
+
+    yield _set
+    monkeypatch.undo()
+    config.refresh_env_cache()
+
+
+def test_env_snapshot_requires_refresh(env):
+    """Test that env changes are only visible after refresh_env_cache()"""
+    env(API_KEY="first")
+    os.environ["API_KEY"] = "second"
+    assert config._get_env("API_KEY") == "first"
+    config.refresh_env_cache()
+    assert config._get_env("API_KEY") == "second"
+
+
+def test_empty_env_value_is_none(env):
+    """Test that blank values are treated as unset"""
+    env(API_KEY="   ")
+    assert config._get_env("API_KEY") is None
+    assert config.load_config().api_key is None
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("1", True), ("true", True), ("TRUE", True), ("On", True), ("yEs", True),
+    ("0", False), ("false", False), ("off", False), ("nope", False),
+])
+def test_bool_parsing(env, raw, expected):
+    """Test truthy values in any casing"""
+    env(VERBOSE=raw)
+    assert config._get_bool("VERBOSE") is expected
+
+
+def test_bool_and_int_parsing(env):
+    """Test boolean and integer helpers"""
+    env(POLICY_ENFORCEMENT="off", MAX_QUERY_CHARS="1234", TASK_TTL_SECONDS="abc")
+    cfg = config.load_config()
+    assert cfg.policy_enforcement is False
+    assert cfg.max_query_chars == 1234
+    assert cfg.task_ttl_seconds == 86400
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("a.com,b.com", ["a.com", "b.com"]),
+    (" a.com , b.com ", ["a.com", "b.com"]),
+    (",a.com,,b.com,", ["a.com", "b.com"]),
+    ("a.com, ,b.com", ["a.com", "b.com"]),
+    (" , ", []),
+])
+def test_csv_parsing(env, raw, expected):
+    """Test CSV parsing drops blanks and surrounding whitespace"""
+    env(ALLOWLISTED_DOMAINS=raw)
+    assert list(config._get_csv("ALLOWLISTED_DOMAINS")) == expected
+
+
+def test_csv_result_is_immutable(env):
+    """Test the cached CSV value cannot be mutated by callers"""
+    env(CORS_ORIGINS="https://a.com,https://b.com")
+    origins = config.load_config().cors_origins
+    assert origins == ("https://a.com", "https://b.com")
+    assert origins is config._get_csv("CORS_ORIGINS", "*")
+    assert isinstance(origins, tuple)
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("8", 8),
+    ("four", 4),
+    ("0", 1),
+    ("-3", 1),
+])
+def test_playwright_max_concurrency(env, raw, expected):
+    """Test bad or non-positive values fall back instead of failing import"""
+    env(PLAYWRIGHT_MAX_CONCURRENCY=raw)
+    assert config.load_config().playwright_max_concurrency == expected
+
+
+def test_allowlisted_domains_frozenset(env):
+    """Test the allowlist is a lower-cased frozenset"""
+    env(ALLOWLISTED_DOMAINS="Example.com, docs.python.org")
+    domains = config.load_config().allowlisted_domains
+    assert isinstance(domains, frozenset)
+    assert domains == {"example.com", "docs.python.org"}
+
+
+def test_load_config_is_cached(env):
+    """Test that load_config() returns a shared instance until refreshed"""
+    env(MAX_QUERY_CHARS="100")
+    cfg = config.load_config()
+    assert config.load_config() is cfg
+    env(MAX_QUERY_CHARS="200")
+    assert config.load_config() is not cfg
+    assert config.load_config().max_query_chars == 200
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,162 @@
+"""
+Tests for the Minimal .env Parser
+
+This module checks src._dotenv_fast against the syntax it claims to support
+and the cached loader shared by run_server.py and src/main.py.
+"""
+
+import pytest
+import os
+import stat
+import subprocess
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src import _dotenv_fast
+
+
+def test_parse_supported_syntax(tmp_path):
+    """Test comments, quotes and export prefixes"""
+    env_file = tmp_path / ".env"
+    env_file.write_text(
+        "# comment\n"
+        "\n"
+        "OPENAI_API_KEY=sk-test\n"
+        "export PORT = 8080\n"
+        'QUOTED="hello # world"\n'
+        "SINGLE='x=y'\n"
+        "INLINE=value # trailing comment\n"
+        "EMPTY=\n"
+        "NO_EQUALS\n"
+    )
+    assert _dotenv_fast.parse(env_file) == {
+        "OPENAI_API_KEY": "sk-test",
+        "PORT": "8080",
+        "QUOTED": "hello # world",
+        "SINGLE": "x=y",
+        "INLINE": "value",
+        "EMPTY": "",
+    }
+
+
+# Lines whose parse must match python-dotenv exactly
+_DOTENV_PARITY_CASES = [
+    'OPENAI_API_KEY="sk-abc"  # prod key',
+    "SINGLE_COMMENT='sk-abc' # prod key",
+    'NEWLINE="x\\ny"',
+    'ESCAPED_QUOTE="say \\"hi\\""',
+    'TAB="a\\tb"',
+    "SINGLE_ESCAPES='it\\'s \\\\ raw \\n'",
+    'HASH_INSIDE="a # b" # c',
+    "PLAIN=value # comment",
+    "TAB_COMMENT=value\t# comment",
+    "ONLY_COMMENT= # comment",
+    "LEADING_HASH=#value",
+    "URL=https://example.com/#anchor",
+]
+
+
+@pytest.mark.parametrize("line", _DOTENV_PARITY_CASES)
+def test_parse_matches_python_dotenv(tmp_path, line):
+    """Test quoted values, trailing comments and escapes match python-dotenv"""
+    dotenv = pytest.importorskip("dotenv")
+    env_file = tmp_path / ".env"
+    env_file.write_text(line + "\n")
+    assert _dotenv_fast.parse(env_file) == dict(dotenv.dotenv_values(env_file))
+
+
+def test_quoted_value_with_comment(tmp_path):
+    """Test a quoted value followed by a comment loses its quotes"""
+    env_file = tmp_path / ".env"
+    env_file.write_text('OPENAI_API_KEY="sk-abc"  # prod key\nC="x\\ny"\n')
+    assert _dotenv_fast.parse(env_file) == {"OPENAI_API_KEY": "sk-abc", "C": "x\ny"}
+
+
+def test_load_does_not_override(tmp_path, monkeypatch):
+    """Test that existing environment variables win"""
+    env_file = tmp_path / ".env"
+    env_file.write_text("DOTENV_FAST_A=from-file\nDOTENV_FAST_B=from-file\n")
+    monkeypatch.setenv("DOTENV_FAST_A", "from-env")
+    monkeypatch.delenv("DOTENV_FAST_B", raising=False)
+    _dotenv_fast.load(env_file)
+    assert os.environ["DOTENV_FAST_A"] == "from-env"
+    assert os.environ["DOTENV_FAST_B"] == "from-file"
+    monkeypatch.delenv("DOTENV_FAST_B")
+
+
+@pytest.fixture
+def clean_env(monkeypatch):
+    """Make sure the variables used below start unset"""
+    for name in ("DOTENV_CACHE_A", "DOTENV_CACHE_B"):
+        monkeypatch.delenv(name, raising=False)
+    return monkeypatch
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX permissions")
+def test_cache_file_is_owner_only(tmp_path, clean_env):
+    """Test the cache holding .env secrets is not world-readable"""
+    env_file = tmp_path / ".env"
+    env_file.write_text("DOTENV_CACHE_A=secret\n")
+    _dotenv_fast.load_cached(env_file)
+    mode = stat.S_IMODE(os.stat(tmp_path / ".env.cache").st_mode)
+    assert mode == 0o600
+    assert os.environ["DOTENV_CACHE_A"] == "secret"
+
+
+def test_cache_invalidated_by_size_change(tmp_path, clean_env):
+    """Test a same-mtime edit that changes the size is re-parsed"""
+    env_file = tmp_path / ".env"
+    env_file.write_text("DOTENV_CACHE_A=one\n")
+    _dotenv_fast.load_cached(env_file)
+    mtime = os.stat(env_file).st_mtime_ns
+
+    env_file.write_text("DOTENV_CACHE_A=one\nDOTENV_CACHE_B=two\n")
+    os.utime(env_file, ns=(mtime, mtime))
+    clean_env.delenv("DOTENV_CACHE_A")
+    _dotenv_fast.load_cached(env_file)
+    assert os.environ["DOTENV_CACHE_B"] == "two"
+
+
+def test_concurrent_cold_loads(tmp_path, clean_env, caplog):
+    """Test workers writing the cache at once do not clobber each other"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    env_file = tmp_path / ".env"
+    env_file.write_text("DOTENV_CACHE_A=one\n")
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda _: _dotenv_fast.load_cached(env_file), range(32)))
+    assert "Could not write" not in caplog.text
+    assert sorted(p.name for p in tmp_path.iterdir()) == [".env", ".env.cache"]
+
+
+def test_cache_is_not_unpickled(tmp_path, clean_env):
+    """Test a pickle planted at the cache path is ignored, not executed"""
+    import pickle
+
+    env_file = tmp_path / ".env"
+    env_file.write_text("DOTENV_CACHE_A=one\n")
+    marker = tmp_path / "pwned"
+    payload = pickle.dumps(type("Evil", (), {
+        "__reduce__": lambda self: (open, (str(marker), "w")),
+    })())
+    (tmp_path / ".env.cache").write_bytes(payload)
+
+    _dotenv_fast.load_cached(env_file)
+    assert not marker.exists()
+    assert os.environ["DOTENV_CACHE_A"] == "one"
+
+
+def test_server_import_skips_python_dotenv():
+    """Test importing the app does not pull in python-dotenv"""
+    root = os.path.join(os.path.dirname(__file__), "..")
+    out = subprocess.run(
+        [sys.executable, "-c", "import sys, src.main; print('dotenv' in sys.modules)"],
+        cwd=root, capture_output=True, text=True, check=True,
+    )
+    assert out.stdout.strip().splitlines()[-1] == "False"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -12,11 +12,19 @@ import sys
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
+from src.config import refresh_env_cache
 from src.main import app
 
 client = TestClient(app)
 
 
+def _reload_config():
+    """Re-read the environment and re-run startup so config changes apply"""
+    refresh_env_cache()
+    with TestClient(app):
+        pass
+
+
 def test_root_endpoint():
     """Test the root endpoint"""
     response = client.get("/")
@@ -83,6 +91,34 @@ def test_invoke_endpoint_unknown_tool():
     assert "error" in data or "content" in data
 
 
+def test_invoke_endpoint_invalid_json():
+    """Test the policy middleware rejects a malformed body"""
+    response = client.post(
+        "/mcp/invoke",
+        content=b"{not json",
+        headers={"Content-Type": "application/json"}
+    )
+    assert response.status_code == 400
+    data = response.json()
+    assert data["isError"] is True
+    assert data["code"] == "INVALID_JSON"
+
+
+def test_invoke_endpoint_query_too_long():
+    """Test the policy middleware enforces the query length limit"""
+    response = client.post(
+        "/mcp/invoke",
+        json={
+            "tool": "agent_executor",
+            "arguments": {"query": "x" * 100000}
+        }
+    )
+    assert response.status_code == 413
+    data = response.json()
+    assert data["isError"] is True
+    assert data["code"] == "QUERY_TOO_LONG"
+
+
 def test_invoke_endpoint_success():
     """Test invoke endpoint with valid request (FR2, FR3, FR4)"""
     # Note: This test requires OPENAI_API_KEY to be set
@@ -112,10 +148,109 @@ def test_invoke_endpoint_success():
         assert data["isError"] is False
 
 
+class _FailingAgent:
+    """Agent stub that raises the given exception on every call"""
+
+    def __init__(self, exc):
+        self.exc = exc
+        self.calls = 0
+
+    def invoke(self, inputs):
+        self.calls += 1
+        raise self.exc
+
+
+@pytest.mark.parametrize("exc, expected_calls, expected_sleeps", [
+    (ValueError("bad prompt"), 1, []),
+    (ConnectionError("connection reset"), 3, [2, 2]),
+])
+def test_invoke_retries_only_transient_errors(monkeypatch, exc, expected_calls, expected_sleeps):
+    """Test agent failures are retried only for transient errors, 2s apart"""
+    from src import main
+
+    agent = _FailingAgent(exc)
+    sleeps = []
+
+    async def _record_sleep(seconds):
+        sleeps.append(seconds)
+
+    # Cache miss: the executor comes from get_agent in a worker thread
+    monkeypatch.setattr(main, "get_cached_agent", lambda *args: None)
+    monkeypatch.setattr(main, "get_agent", lambda **kwargs: agent)
+    monkeypatch.setattr(main.asyncio, "sleep", _record_sleep)
+
+    response = client.post(
+        "/mcp/invoke",
+        json={
+            "tool": "agent_executor",
+            "arguments": {"query": "test"}
+        }
+    )
+    assert response.status_code == 500
+    assert response.json()["isError"] is True
+    assert agent.calls == expected_calls
+    assert sleeps == expected_sleeps
+
+
+class _AsyncAgent:
+    """Agent stub exposing only the native async interface"""
+
+    async def ainvoke(self, inputs):
+        return {"output": f"echo: {inputs['input']}"}
+
+
+def _no_build(**kwargs):
+    raise AssertionError("get_agent called for an already-built executor")
+
+
+def test_invoke_uses_native_ainvoke(monkeypatch):
+    """Test a cached agent with ainvoke runs on the event loop and records success"""
+    from src import main
+
+    monkeypatch.setattr(main, "get_cached_agent", lambda *args: _AsyncAgent())
+    monkeypatch.setattr(main, "get_agent", _no_build)
+
+    response = client.post(
+        "/mcp/invoke",
+        json={
+            "tool": "agent_executor",
+            "arguments": {"query": "hello", "task_id": "ainvoke-task"}
+        }
+    )
+    assert response.status_code == 200
+    assert response.json()["content"][0]["text"] == "echo: hello"
+
+    task = client.get("/api/tasks/ainvoke-task")
+    assert task.status_code == 200
+    assert task.json()["status"] == "succeeded"
+
+
+def test_resumed_task_records_new_query(monkeypatch):
+    """Test resuming a task_id with a different query updates its summary"""
+    from src import main
+
+    monkeypatch.setattr(main, "get_cached_agent", lambda *args: _AsyncAgent())
+    for query in ("first query", "second query"):
+        response = client.post(
+            "/mcp/invoke",
+            json={
+                "tool": "agent_executor",
+                "arguments": {"query": query, "task_id": "resumed-task"}
+            }
+        )
+        assert response.status_code == 200
+
+    task = client.get("/api/tasks/resumed-task").json()
+    assert task["attempts"] == 2
+    assert task["query_preview"] == "second query"
+    assert task["query_sha256"] == main._sha256("second query")
+
+
 def test_invoke_endpoint_with_auth():
     """Test invoke endpoint with API key authentication (NFR2)"""
     # Set API key in environment
     os.environ["API_KEY"] = "test-key-123"
+    _reload_config()
     
     # Test without auth header
     response = client.post(
@@ -152,6 +287,96 @@ def test_invoke_endpoint_with_auth():
     
     # Clean up
     del os.environ["API_KEY"]
+    _reload_config()
+
+
+def test_playwright_snapshot_cache_hit():
+    """Test cached snapshots are served and promoted in the LRU cache"""
+    from src import main
+
+    main._playwright_cache.clear()
+    main._playwright_cache["https://example.com"] = {
+        "snapshot": "[body]",
+        "url": "https://example.com",
+        "token_count": 1
+    }
+    main._playwright_cache["https://example.org"] = {
+        "snapshot": "[body]",
+        "url": "https://example.org",
+        "token_count": 1
+    }
+
+    response = client.post(
+        "/api/playwright/snapshot",
+        json={"url": "example.com"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["cached"] is True
+    assert data["snapshot"] == "[body]"
+    assert next(reversed(main._playwright_cache)) == "https://example.com"
+    main._playwright_cache.clear()
+
+
+def test_large_responses_are_gzipped():
+    """Test large responses are compressed when the client accepts gzip"""
+    from src import main
+
+    main._playwright_cache.clear()
+    main._playwright_cache["https://example.com"] = {
+        "snapshot": "[button]\n  Name: Search\n" * 200,
+        "url": "https://example.com",
+        "token_count": 1
+    }
+
+    response = client.post(
+        "/api/playwright/snapshot",
+        json={"url": "example.com"},
+        headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["cached"] is True
+    main._playwright_cache.clear()
+
+
+def test_playwright_test_prompt_matches():
+    """Test keyword matching reports line numbers, context and totals"""
+    snapshot = "\n".join(
+        ["[heading] Welcome", "[button] Sign In", "[textbox] Email"]
+        + [f"[link] Item {i}" for i in range(12)]
+    )
+    response = client.post(
+        "/api/playwright/test-prompt",
+        json={"snapshot": snapshot, "prompt": "Click the LOGIN button or a link"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_matches"] == 13
+    assert len(data["matches"]) == 10
+    assert data["matches"][0]["line"] == 2
+    assert data["matches"][0]["content"] == "[button] Sign In"
+    assert data["matches"][0]["context"].startswith("[heading] Welcome")
+    assert data["matches"][1]["line"] == 4
+
+
+def test_cors_origins_are_trimmed():
+    """Test every comma-separated CORS origin is allowed, spaces and all"""
+    import subprocess
+
+    script = (
+        "from fastapi.testclient import TestClient\n"
+        "from src.main import app\n"
+        "r = TestClient(app).get('/health', headers={'Origin': 'https://b.com'})\n"
+        "print(r.headers.get('access-control-allow-origin'))\n"
+    )
+    env = dict(os.environ, CORS_ORIGINS="https://a.com, https://b.com")
+    out = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=os.path.join(os.path.dirname(__file__), ".."),
+        env=env, capture_output=True, text=True, check=True,
+    )
+    assert out.stdout.strip().splitlines()[-1] == "https://b.com"
 
 
 if __name__ == "__main__":
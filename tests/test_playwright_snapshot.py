@@ -0,0 +1,117 @@
+"""
+Tests for Playwright Snapshot Helpers
+
+This module contains tests for the accessibility snapshot formatting.
+No browser is launched.
+"""
+
+import pytest
+import asyncio
+import os
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.main import _AX_TREE_JS, _format_ax_tree, _page_ax_tree, _wait_for_settle
+
+
+def test_format_ax_tree():
+    """Test accessibility tree formatting"""
+    tree = {
+        "role": "body",
+        "name": "",
+        "children": [
+            {"role": "form", "name": "Search", "children": [
+                {"role": "textbox", "name": "Query", "value": "cats"},
+                {"role": "checkbox", "name": "Safe", "checked": False},
+            ]},
+            {"role": "link", "name": "Home", "description": "Go home"},
+        ],
+    }
+    assert _format_ax_tree(tree) == "\n".join([
+        "[body]",
+        "  [form]",
+        "    Name: Search",
+        "    [textbox]",
+        "      Name: Query",
+        "      Value: cats",
+        "    [checkbox]",
+        "      Name: Safe",
+        "      Checked: False",
+        "  [link]",
+        "    Name: Home",
+        "    Description: Go home",
+    ])
+
+
+def test_format_ax_tree_deep():
+    """Test very deep trees do not hit the recursion limit"""
+    tree = {"role": "leaf"}
+    for _ in range(5000):
+        tree = {"role": "group", "children": [tree]}
+    lines = _format_ax_tree(tree).split("\n")
+    assert len(lines) == 5001
+    assert lines[-1] == "  " * 5000 + "[leaf]"
+
+
+def test_format_ax_tree_empty():
+    """Test formatting when no tree is available"""
+    assert _format_ax_tree(None) == "No accessibility tree available"
+
+
+class _FakeAccessibility:
+    def __init__(self):
+        self.calls = []
+
+    async def snapshot(self, **kwargs):
+        self.calls.append(kwargs)
+        return {"role": "WebArea", "name": "native"}
+
+
+class _FakePage:
+    def __init__(self, native: bool):
+        if native:
+            self.accessibility = _FakeAccessibility()
+        self.evaluated = []
+
+    async def evaluate(self, script):
+        self.evaluated.append(script)
+        return {"role": "body", "name": "js"}
+
+
+def test_page_ax_tree_prefers_native_snapshot():
+    """Test the native accessibility snapshot is used when available"""
+    page = _FakePage(native=True)
+    tree = asyncio.run(_page_ax_tree(page))
+    assert tree["name"] == "native"
+    assert page.accessibility.calls == [{"interesting_only": True}]
+    assert page.evaluated == []
+
+
+def test_page_ax_tree_falls_back_to_dom_walk():
+    """Test the in-page script is used without page.accessibility"""
+    page = _FakePage(native=False)
+    tree = asyncio.run(_page_ax_tree(page))
+    assert tree["name"] == "js"
+    assert page.evaluated == [_AX_TREE_JS]
+
+
+class _NeverIdlePage:
+    def __init__(self):
+        self.calls = []
+
+    async def wait_for_load_state(self, state, timeout):
+        self.calls.append((state, timeout))
+        raise TimeoutError("network never went idle")
+
+
+def test_wait_for_settle_tolerates_busy_pages():
+    """Test settling waits for network idle and gives up quietly"""
+    page = _NeverIdlePage()
+    asyncio.run(_wait_for_settle(page))
+    assert page.calls == [("networkidle", 2000)]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
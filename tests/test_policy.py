@@ -0,0 +1,85 @@
+"""
+Tests for the Invoke Policy
+
+This module contains tests for query length and domain allowlist checks.
+"""
+
+import pytest
+import os
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.policy import _domain_of, _extract_urls, evaluate_invoke_policy
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://Example.com/path", "example.com"),
+    ("http://user:pw@docs.python.org:8080/x", "docs.python.org"),
+    ("https://example.com?next=/evil", "example.com"),
+    ("https://[::1", "[::1"),
+])
+def test_domain_of(url, expected):
+    """Test host extraction from URLs"""
+    assert _domain_of(url) == expected
+
+
+def test_extract_urls_is_lazy():
+    """Test URLs are yielded in order without building a list"""
+    urls = _extract_urls("see https://a.com and (http://b.org/x) 'https://c.net'")
+    assert next(urls) == "https://a.com"
+    assert list(urls) == ["http://b.org/x", "https://c.net"]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("HTTPS://Example.com/a b", ["HTTPS://Example.com/a"]),
+    ("nohttp://x.com", ["http://x.com"]),
+    ("ftp://x.com and http:// alone", []),
+    ("http://a.com/http://b.com", ["http://a.com/http://b.com"]),
+    ("<https://a.com>\nhttp://b.com", ["https://a.com", "http://b.com"]),
+])
+def test_extract_urls(text, expected):
+    """Test URL extraction edge cases"""
+    assert list(_extract_urls(text)) == expected
+
+
+def test_query_too_long():
+    """Test the length limit returns 413"""
+    decision = evaluate_invoke_policy("x" * 11, max_query_chars=10, allowlisted_domains=())
+    assert not decision.allowed
+    assert decision.status_code == 413
+    assert decision.code == "QUERY_TOO_LONG"
+
+
+def test_empty_allowlist_allows_any_domain():
+    """Test that an empty allowlist disables the domain check"""
+    decision = evaluate_invoke_policy("open https://evil.com", 100, frozenset())
+    assert decision.allowed
+
+
+@pytest.mark.parametrize("query, allowed", [
+    ("open https://example.com/page", True),
+    ("open https://docs.Example.com/page", True),
+    ("open https://notexample.com", False),
+    ("open https://example.com.evil.org", False),
+    ("no urls at all", True),
+])
+def test_domain_allowlist(query, allowed):
+    """Test exact and subdomain matches against the allowlist"""
+    decision = evaluate_invoke_policy(query, 1000, frozenset({"example.com"}))
+    assert decision.allowed is allowed
+    if not allowed:
+        assert decision.status_code == 403
+        assert decision.code == "DOMAIN_NOT_ALLOWED"
+
+
+def test_first_disallowed_host_is_reported():
+    """Test evaluation stops at the first disallowed URL"""
+    query = "https://example.com https://bad.org https://worse.net"
+    decision = evaluate_invoke_policy(query, 1000, ["Example.COM"])
+    assert decision.reason == "Domain not allowlisted: bad.org"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,229 @@
+"""
+Tests for the Redis State Store
+
+This module runs RedisStateStore against an in-process fake of the
+redis.asyncio client, so no Redis server is needed. The fake stores bytes
+like a real client with decode_responses=False and executes the store's Lua
+scripts by translating their redis.call lines to Python.
+"""
+
+import pytest
+import asyncio
+import os
+import re
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import orjson
+import redis.asyncio
+
+from src.state_store import RedisStateStore, TaskRecord, now_ts
+
+
+def _b(value) -> bytes:
+    """Encode a command argument the way redis-py does"""
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, str):
+        return value.encode()
+    return str(value).encode()
+
+
+def _stop(end: int):
+    """Convert an inclusive Redis end index to a Python slice stop"""
+    return None if end == -1 else end + 1
+
+
+class _FakeScript:
+    def __init__(self, client, lua: str):
+        self.client = client
+        self.lines = [line.strip() for line in lua.strip().splitlines() if line.strip()]
+
+    async def __call__(self, keys=(), args=()):
+        self.client.calls.append(("evalsha", list(keys), list(args)))
+        scope = {
+            "call": self.client.call,
+            "KEYS": [_b(k) for k in keys],
+            "ARGV": [_b(a) for a in args],
+            "int": int,
+        }
+        for line in self.lines:
+            expr = line.replace("redis.call(", "call(").replace("tonumber(", "int(")
+            expr = re.sub(r"(KEYS|ARGV)\[(\d+)\]", r"\1[\2 - 1]", expr)
+            eval(expr, scope)
+
+
+class _FakeRedis:
+    """Just enough of redis.asyncio.Redis for RedisStateStore"""
+
+    def __init__(self, *args, **kwargs):
+        self.strings = {}
+        self.ttls = {}
+        self.lists = {}
+        self.calls = []
+        self.scripts = []
+
+    def register_script(self, lua: str) -> _FakeScript:
+        script = _FakeScript(self, lua)
+        self.scripts.append(script)
+        return script
+
+    def call(self, command: str, *args):
+        command = command.upper()
+        if command == "SET":
+            key, value = _b(args[0]), _b(args[1])
+            self.strings[key] = value
+            if len(args) > 2 and _b(args[2]).upper() == b"EX":
+                self.ttls[key] = int(args[3])
+        elif command == "LREM":
+            key, value = _b(args[0]), _b(args[2])
+            self.lists[key] = [v for v in self.lists.get(key, []) if v != value]
+        elif command == "LPUSH":
+            key = _b(args[0])
+            for value in args[1:]:
+                self.lists.setdefault(key, []).insert(0, _b(value))
+        elif command == "LTRIM":
+            key = _b(args[0])
+            self.lists[key] = self.lists.get(key, [])[int(args[1]):_stop(int(args[2]))]
+        else:
+            raise NotImplementedError(command)
+
+    async def ping(self):
+        return True
+
+    async def set(self, key, value, ex=None):
+        self.calls.append(("set", key))
+        self.call("SET", key, value, *(("EX", ex) if ex is not None else ()))
+
+    async def get(self, key):
+        self.calls.append(("get", key))
+        return self.strings.get(_b(key))
+
+    async def mget(self, keys):
+        self.calls.append(("mget", list(keys)))
+        return [self.strings.get(_b(k)) for k in keys]
+
+    async def lrange(self, key, start, end):
+        self.calls.append(("lrange", key, start, end))
+        return list(self.lists.get(_b(key), [])[start:_stop(end)])
+
+    async def aclose(self):
+        pass
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """RedisStateStore wired to a fake client"""
+    monkeypatch.setattr(redis.asyncio, "Redis", _FakeRedis)
+    return RedisStateStore("redis://localhost:6379/0")
+
+
+def _record(task_id: str, status: str = "running") -> TaskRecord:
+    ts = now_ts()
+    return TaskRecord(
+        task_id=task_id,
+        created_at=ts,
+        updated_at=ts,
+        status=status,
+        attempts=1,
+        query_preview="query",
+        query_sha256="abc",
+    )
+
+
+def test_put_task_and_track_is_one_script_call(store):
+    """Test the SET and recent-list update go out as a single EVALSHA"""
+    async def scenario():
+        rec = _record("t1")
+        await store.put_task_and_track(rec, ttl_seconds=60, max_items=10)
+        assert store._r.calls == [(
+            "evalsha",
+            ["task:t1", "recent_tasks"],
+            [orjson.dumps(rec.to_dict()), 60, "t1", 10],
+        )]
+        assert store._r.ttls[b"task:t1"] == 60
+        assert await store.get_task("t1") == rec
+
+    asyncio.run(scenario())
+
+
+def test_recent_list_dedupes_and_trims(store):
+    """Test resubmitted ids move to the front and the list is capped"""
+    async def scenario():
+        for tid in ["a", "b", "c", "a"]:
+            await store.put_task_and_track(_record(tid), ttl_seconds=60, max_items=3)
+        assert await store.list_recent(10) == ["a", "c", "b"]
+        await store.add_recent("d", max_items=3)
+        assert await store.list_recent(10) == ["d", "a", "c"]
+        assert store._r.calls[-2] == ("evalsha", ["recent_tasks"], ["d", 3])
+
+    asyncio.run(scenario())
+
+
+def test_list_recent_decodes_ids(store):
+    """Test ids come back as str although replies are bytes"""
+    async def scenario():
+        await store.add_recent("t1", max_items=5)
+        ids = await store.list_recent(5)
+        assert ids == ["t1"] and isinstance(ids[0], str)
+
+    asyncio.run(scenario())
+
+
+def test_get_tasks_uses_one_mget(store):
+    """Test bulk lookups are a single MGET and keep order"""
+    async def scenario():
+        await store.put_task(_record("t1"), ttl_seconds=60)
+        await store.put_task(_record("t2"), ttl_seconds=60)
+        store._r.calls.clear()
+        recs = await store.get_tasks(["t2", "missing", "t1"])
+        assert [r.task_id if r else None for r in recs] == ["t2", None, "t1"]
+        assert store._r.calls == [("mget", ["task:t2", "task:missing", "task:t1"])]
+        assert await store.get_tasks([]) == []
+        assert len(store._r.calls) == 1
+
+    asyncio.run(scenario())
+
+
+def test_list_recent_records_is_lrange_plus_mget(store):
+    """Test recent records take two round-trips and skip expired keys"""
+    async def scenario():
+        for tid in ["a", "b", "c"]:
+            await store.put_task_and_track(_record(tid), ttl_seconds=60, max_items=10)
+        del store._r.strings[b"task:b"]  # expired in Redis
+        store._r.calls.clear()
+        records = await store.list_recent_records(10)
+        assert [r.task_id for r in records] == ["c", "a"]
+        assert store._r.calls == [
+            ("lrange", "recent_tasks", 0, 9),
+            ("mget", [b"task:c", b"task:b", b"task:a"]),
+        ]
+
+    asyncio.run(scenario())
+
+
+def test_list_recent_records_empty(store):
+    """Test an empty recent list skips the MGET"""
+    async def scenario():
+        assert await store.list_recent_records(10) == []
+        assert [c[0] for c in store._r.calls] == ["lrange"]
+
+    asyncio.run(scenario())
+
+
+def test_connect_pings_and_closes(monkeypatch):
+    """Test connect() checks the server before returning the store"""
+    monkeypatch.setattr(redis.asyncio, "Redis", _FakeRedis)
+
+    async def scenario():
+        store = await RedisStateStore.connect("redis://localhost:6379/0")
+        assert isinstance(store._r, _FakeRedis)
+        await store.close()
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
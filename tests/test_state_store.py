@@ -0,0 +1,140 @@
+"""
+Tests for the Task State Store
+
+This module contains tests for the in-memory state store backend.
+"""
+
+import pytest
+import asyncio
+import os
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.state_store import InMemoryStateStore, TaskRecord, now_ts
+
+
+def _record(task_id: str, status: str = "running") -> TaskRecord:
+    ts = now_ts()
+    return TaskRecord(
+        task_id=task_id,
+        created_at=ts,
+        updated_at=ts,
+        status=status,
+        attempts=1,
+        query_preview="query",
+        query_sha256="abc",
+    )
+
+
+def test_put_and_get_task():
+    """Test storing and reading a task record"""
+    async def scenario():
+        store = InMemoryStateStore()
+        await store.put_task(_record("t1"), ttl_seconds=60)
+        rec = await store.get_task("t1")
+        assert rec is not None
+        assert rec.status == "running"
+        assert await store.get_task("missing") is None
+
+    asyncio.run(scenario())
+
+
+def test_get_tasks_batch():
+    """Test batched lookups keep order and return None for missing ids"""
+    async def scenario():
+        store = InMemoryStateStore()
+        await store.put_task(_record("t1"), ttl_seconds=60)
+        await store.put_task(_record("t2"), ttl_seconds=60)
+        recs = await store.get_tasks(["t2", "missing", "t1"])
+        assert [r.task_id if r else None for r in recs] == ["t2", None, "t1"]
+        assert await store.get_tasks([]) == []
+
+    asyncio.run(scenario())
+
+
+def test_expired_tasks_are_dropped():
+    """Test records past their TTL are no longer returned"""
+    async def scenario():
+        store = InMemoryStateStore()
+        await store.put_task(_record("old"), ttl_seconds=0)
+        await store.put_task(_record("new"), ttl_seconds=60)
+        assert await store.get_task("old") is None
+        recs = await store.get_tasks(["old", "new"])
+        assert recs[0] is None and recs[1].task_id == "new"
+
+    asyncio.run(scenario())
+
+
+def test_task_cap_evicts_least_recently_used():
+    """Test the store stays bounded and keeps recently read records"""
+    async def scenario():
+        store = InMemoryStateStore(max_tasks=2)
+        await store.put_task(_record("a"), ttl_seconds=60)
+        await store.put_task(_record("b"), ttl_seconds=60)
+        await store.get_task("a")
+        await store.put_task(_record("c"), ttl_seconds=60)
+        assert await store.get_task("b") is None
+        assert await store.get_task("a") is not None
+        assert await store.get_task("c") is not None
+
+    asyncio.run(scenario())
+
+
+def test_list_recent_records():
+    """Test recent records come back newest first without expired ones"""
+    async def scenario():
+        store = InMemoryStateStore()
+        await store.put_task_and_track(_record("a"), ttl_seconds=60, max_items=10)
+        await store.put_task_and_track(_record("b"), ttl_seconds=0, max_items=10)
+        await store.put_task_and_track(_record("c"), ttl_seconds=60, max_items=10)
+        records = await store.list_recent_records(10)
+        assert [r.task_id for r in records] == ["c", "a"]
+
+    asyncio.run(scenario())
+
+
+def test_recent_order_and_trim():
+    """Test recent tasks are newest first, deduplicated and trimmed"""
+    async def scenario():
+        store = InMemoryStateStore()
+        for tid in ["a", "b", "c", "a"]:
+            await store.add_recent(tid, max_items=3)
+        assert await store.list_recent(10) == ["a", "c", "b"]
+        await store.add_recent("d", max_items=3)
+        assert await store.list_recent(10) == ["d", "a", "c"]
+        assert await store.list_recent(2) == ["d", "a"]
+
+    asyncio.run(scenario())
+
+
+def test_put_task_and_track():
+    """Test the fused write stores the record and tracks it as recent"""
+    async def scenario():
+        store = InMemoryStateStore()
+        await store.put_task_and_track(_record("t1"), ttl_seconds=60, max_items=10)
+        await store.put_task_and_track(_record("t2"), ttl_seconds=60, max_items=10)
+        assert await store.get_task("t1") is not None
+        assert await store.list_recent(10) == ["t2", "t1"]
+
+    asyncio.run(scenario())
+
+
+def test_record_round_trip():
+    """Test TaskRecord serialization round trip"""
+    rec = _record("t1", status="succeeded")
+    rec.last_output_preview = "done"
+    assert TaskRecord.from_dict(rec.to_dict()) == rec
+
+
+def test_record_has_no_instance_dict():
+    """Test TaskRecord uses slots instead of a per-instance __dict__"""
+    rec = _record("t1")
+    assert not hasattr(rec, "__dict__")
+    with pytest.raises(AttributeError):
+        rec.unexpected = 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])